@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# 操作类别
+NAVIGATION = "navigation"  # 进入交易行、打开/关闭商品页
+REFRESH = "refresh"  # 刷新列表
+PURCHASE = "purchase"  # 点击购买
+
+DEFAULT_LIMITS = {
+    # 每秒补充的令牌数与允许的突发次数，rate 为 0 表示不限速
+    NAVIGATION: {'rate': 20.0, 'burst': 5},
+    REFRESH: {'rate': 4.0, 'burst': 1},
+    PURCHASE: {'rate': 10.0, 'burst': 2},
+}
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    reserve() 立即预扣一个令牌并返回需要等待的时间，等待由调用方完成，
+    这样等待可以被停止信号打断，而不会在锁内阻塞。
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def configure(self, rate: float, burst: int):
+        """修改速率和突发次数，保留当前令牌（不超过新的突发次数）和统计"""
+        with self._lock:
+            self.rate = rate
+            self.burst = max(1, burst)
+            self._tokens = min(self._tokens, float(self.burst))
+
+    def reserve(self) -> float:
+        """预扣一个令牌，返回获得该令牌前需要等待的秒数"""
+        with self._lock:
+            self.acquired += 1
+            if self.rate <= 0:
+                return 0.0
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            delay = -self._tokens / self.rate
+            self.throttled += 1
+            self.waited += delay
+            return delay
+
+    def stats(self) -> Dict[str, float]:
+        """饱和度：需要等待的次数占比与累计等待时间"""
+        with self._lock:
+            acquired, throttled, waited = self.acquired, self.throttled, self.waited
+        return {
+            'acquired': acquired,
+            'throttled': throttled,
+            'saturation': throttled / acquired if acquired else 0.0,
+            'waited': waited,
+        }
+
+
+class ActionLimiter:
+    """按操作类别分别限速的动作限流器"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict]] = None):
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.configure(limits)
+
+    def configure(self, limits: Optional[Dict[str, Dict]] = None):
+        """按类别应用限速配置：每类在默认值上逐项覆盖，已有的令牌桶原地修改，统计不清零"""
+        limits = limits or {}
+        for kind in {**DEFAULT_LIMITS, **limits}:
+            limit = {**DEFAULT_LIMITS.get(kind, {'rate': 0, 'burst': 1}), **limits.get(kind, {})}
+            rate, burst = float(limit['rate']), int(limit['burst'])
+            bucket = self.buckets.get(kind)
+            if bucket is None:
+                self.buckets[kind] = TokenBucket(rate, burst)
+            else:
+                bucket.configure(rate, burst)
+
+    def acquire(self, kind: str, wait: Callable[[float], None] = time.sleep):
+        """取得一次 kind 类操作的许可，需要时通过 wait 等待"""
+        bucket = self.buckets.get(kind)
+        if bucket is None:
+            return
+        delay = bucket.reserve()
+        if delay > 0:
+            wait(delay)
+
+    def format_summary(self) -> Optional[str]:
+        """各类别的限流摘要"""
+        parts = []
+        for kind, bucket in self.buckets.items():
+            stats = bucket.stats()
+            if stats['acquired']:
+                parts.append(f"{kind} {stats['acquired']} 次 (限流 {stats['saturation']:.0%}, "
+                             f"等待 {stats['waited'] * 1000:.0f}ms)")
+        return " | ".join(parts) or None
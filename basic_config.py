@@ -1,12 +1,12 @@
 import time
 from enum import Enum
 
-from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtWidgets import QMessageBox, QCheckBox, QLabel, QPushButton
 
 from config import write_config_field
 from selection_window import SelectionWindow
 from ui import Ui_MainWindow
-from utils import check_game_window
+from utils import check_game_window, to_config_position
 
 
 class PositionSettingName(Enum):
@@ -16,6 +16,9 @@ class PositionSettingName(Enum):
     BUY_BTN = "buy_btn_location"
     TRADE_BTN = "trade_btn_location"
     BUY_MESSAGE = "buy_message_location"
+    QUANTITY_INPUT = "quantity_input_location"
+    TOTAL_PRICE = "total_price_location"
+    REFRESH_BTN = "refresh_location"
 
 class BasicConfig:
     """
@@ -28,8 +31,16 @@ class BasicConfig:
     product_price_location = []
     trade_btn_location = []
     buy_message_location = []
+    quantity_input_location = []
+    total_price_location = []
+    refresh_location = []
     exec_interval = 0.1
     buy_confirm_interval = 0.5
+    input_backend = "direct"
+    click_hold_interval = 0.0
+    calibrate_on_start = False
+    stay_on_page = False
+    monitor_mode = False
     current_position_setting:PositionSettingName
 
     def __init__(self, parent: Ui_MainWindow, config: dict = None):
@@ -42,8 +53,16 @@ class BasicConfig:
         self.product_price_location = config.get("product_price_location", [])
         self.trade_btn_location = config.get("trade_btn_location", [])
         self.buy_message_location = config.get("buy_message_location", [])
+        self.quantity_input_location = config.get("quantity_input_location", [])
+        self.total_price_location = config.get("total_price_location", [])
+        self.refresh_location = config.get("refresh_location", [])
         self.exec_interval = config.get("exec_interval", 0.1)
         self.buy_confirm_interval = config.get("buy_confirm_interval", 0.5)
+        self.input_backend = config.get("input_backend", "direct")
+        self.click_hold_interval = config.get("click_hold_interval", 0.0)
+        self.calibrate_on_start = config.get("calibrate_on_start", False)
+        self.stay_on_page = config.get("stay_on_page", False)
+        self.monitor_mode = config.get("monitor_mode", False)
 
         self.init_ui()
         self.__connect_signal_to_slot__()
@@ -51,6 +70,16 @@ class BasicConfig:
     def init_ui(self):
         self.parent.debug_mode.setChecked(self.is_debug)
         self.parent.loop_mode.setChecked(self.is_loop)
+        # ui.py 由设计器生成，校准开关以代码方式加入运行模式分组
+        self.calibrate_mode = QCheckBox("启动时校准间隔", self.parent.mode_box)
+        self.calibrate_mode.setChecked(self.calibrate_on_start)
+        self.parent.horizontalLayout_5.addWidget(self.calibrate_mode)
+        self.stay_on_page_mode = QCheckBox("停留商品页刷新", self.parent.mode_box)
+        self.stay_on_page_mode.setChecked(self.stay_on_page)
+        self.parent.horizontalLayout_5.addWidget(self.stay_on_page_mode)
+        self.monitor_mode_check = QCheckBox("只监控价格", self.parent.mode_box)
+        self.monitor_mode_check.setChecked(self.monitor_mode)
+        self.parent.horizontalLayout_5.addWidget(self.monitor_mode_check)
         self.parent.exec_interval_spin_box.setValue(self.exec_interval)
         self.parent.buy_confirm_interval_spin_box.setValue(self.buy_confirm_interval)
         self.parent.buy_btn_location_label.setText(f"交易行购买按钮位置：{self.buy_btn_location}")
@@ -58,6 +87,16 @@ class BasicConfig:
         self.parent.product_price_location_label.setText(f"交易行商品价格位置：{self.product_price_location}")
         self.parent.trade_btn_location_label.setText(f"交易行交易按钮位置：{self.trade_btn_location}")
         self.parent.buy_message_location_label.setText(f"交易行购买提示位置：{self.buy_message_location}")
+        # 一次购买多件用到的区域（可选），同样以代码方式加入位置设置表单
+        self.quantity_input_location_label = QLabel(f"商品页数量输入框位置：{self.quantity_input_location}")
+        self.quantity_input_location_btn = QPushButton("点击选择")
+        self.parent.formLayout.addRow(self.quantity_input_location_label, self.quantity_input_location_btn)
+        self.total_price_location_label = QLabel(f"商品页总价位置：{self.total_price_location}")
+        self.total_price_location_btn = QPushButton("点击选择")
+        self.parent.formLayout.addRow(self.total_price_location_label, self.total_price_location_btn)
+        self.refresh_location_label = QLabel(f"商品页刷新按钮位置：{self.refresh_location}")
+        self.refresh_location_btn = QPushButton("点击选择")
+        self.parent.formLayout.addRow(self.refresh_location_label, self.refresh_location_btn)
 
 
     def select_position(self, current_position_setting:PositionSettingName):
@@ -69,6 +108,7 @@ class BasicConfig:
     def set_selection_area(self, x1, y1, x2, y2):
         """设置选择区域"""
         self.selection_window.hide()
+        x1, y1 = to_config_position(getattr(self, "game_window", None), x1, y1)
         location = [x1, y1, x2, y2]
         if self.current_position_setting == PositionSettingName.BUY_BTN:
             self.buy_btn_location = location
@@ -85,6 +125,15 @@ class BasicConfig:
         elif self.current_position_setting == PositionSettingName.BUY_MESSAGE:
             self.buy_message_location = location
             self.parent.buy_message_location_label.setText(f"交易行购买提示位置：{self.buy_message_location}")
+        elif self.current_position_setting == PositionSettingName.QUANTITY_INPUT:
+            self.quantity_input_location = location
+            self.quantity_input_location_label.setText(f"商品页数量输入框位置：{self.quantity_input_location}")
+        elif self.current_position_setting == PositionSettingName.TOTAL_PRICE:
+            self.total_price_location = location
+            self.total_price_location_label.setText(f"商品页总价位置：{self.total_price_location}")
+        elif self.current_position_setting == PositionSettingName.REFRESH_BTN:
+            self.refresh_location = location
+            self.refresh_location_label.setText(f"商品页刷新按钮位置：{self.refresh_location}")
 
         # 更新配置文件
         self.write_config(self.current_position_setting.value, location)
@@ -103,6 +152,21 @@ class BasicConfig:
         self.is_loop = is_loop
         self.write_config("is_loop", is_loop)
 
+    def set_calibrate_on_start(self, enabled:bool):
+        """设置启动时校准"""
+        self.calibrate_on_start = enabled
+        self.write_config("calibrate_on_start", enabled)
+
+    def set_stay_on_page(self, enabled:bool):
+        """设置停留商品页刷新"""
+        self.stay_on_page = enabled
+        self.write_config("stay_on_page", enabled)
+
+    def set_monitor_mode(self, enabled:bool):
+        """设置只监控价格"""
+        self.monitor_mode = enabled
+        self.write_config("monitor_mode", enabled)
+
     def set_exec_interval(self, interval:float):
         """设置执行间隔"""
         self.exec_interval = interval
@@ -120,7 +184,13 @@ class BasicConfig:
         self.parent.product_price_location_btn.clicked.connect(lambda: self.select_position(PositionSettingName.PRODUCT_PRICE))
         self.parent.trade_btn_location_btn.clicked.connect(lambda: self.select_position(PositionSettingName.TRADE_BTN))
         self.parent.buy_message_location_btn.clicked.connect(lambda: self.select_position(PositionSettingName.BUY_MESSAGE))
+        self.quantity_input_location_btn.clicked.connect(lambda: self.select_position(PositionSettingName.QUANTITY_INPUT))
+        self.total_price_location_btn.clicked.connect(lambda: self.select_position(PositionSettingName.TOTAL_PRICE))
+        self.refresh_location_btn.clicked.connect(lambda: self.select_position(PositionSettingName.REFRESH_BTN))
         self.parent.debug_mode.toggled.connect(self.set_debug_mode)
         self.parent.loop_mode.toggled.connect(self.set_loop_mode)
+        self.calibrate_mode.toggled.connect(self.set_calibrate_on_start)
+        self.stay_on_page_mode.toggled.connect(self.set_stay_on_page)
+        self.monitor_mode_check.toggled.connect(self.set_monitor_mode)
         self.parent.exec_interval_spin_box.valueChanged.connect(self.set_exec_interval)
         self.parent.buy_confirm_interval_spin_box.valueChanged.connect(self.set_buy_confirm_interval)
@@ -0,0 +1,84 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+TRANSITIONS = ('trade', 'open_product', 'close')
+FRAME_POLL_INTERVAL = 0.005  # 两次采样之间的间隔
+PIXEL_DIFF_THRESHOLD = 32  # 单个像素灰度差超过该值视为变化
+FRAME_CHANGE_RATIO = 0.001  # 变化像素占比超过该值视为画面变化（文字区域通常很稀疏）
+STABLE_FRAMES = 3  # 连续多少帧不变视为界面已稳定
+TRANSITION_TIMEOUT = 3.0  # 单次切换的最长等待时间
+DEFAULT_CYCLES = 3
+DEFAULT_MARGIN = 1.5  # 实测值乘以的安全系数
+MIN_INTERVAL = 0.02
+
+
+def frame_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """两帧之间发生变化的像素占比"""
+    if a.shape != b.shape or a.size == 0:
+        return 1.0
+    return np.count_nonzero(np.abs(a.astype(np.int16) - b) > PIXEL_DIFF_THRESHOLD) / a.size
+
+
+def default_transition_intervals(exec_interval: float) -> Dict[str, float]:
+    """未校准时各类等待的默认值：打开商品页保持原来点击后两次等待的总时长，页内刷新不参与校准"""
+    return {'trade': exec_interval, 'open_product': exec_interval * 2, 'close': exec_interval,
+            'refresh': exec_interval}
+
+
+class TransitionCalibrator:
+    """
+    界面切换耗时测量
+
+    执行一次操作后持续截取观察区域：先等待画面发生变化，再等待连续 STABLE_FRAMES 帧不变，
+    最后一次变化的时刻即界面稳定所需的时间。
+    """
+
+    def __init__(self, grab: Callable[[tuple], object], wait: Callable[[float], None], logger=None):
+        self._grab = grab
+        self._wait = wait
+        self.logger = logger
+        self.samples: Dict[str, List[float]] = {key: [] for key in TRANSITIONS}
+
+    def _frame(self, region) -> Optional[np.ndarray]:
+        """截取观察区域，截图失败时返回 None（视为尚无画面）"""
+        image = self._grab(region)
+        return np.asarray(image) if image is not None else None
+
+    def measure(self, transition: str, action: Callable[[], None], region) -> Optional[float]:
+        """执行 action 并返回界面稳定耗时（秒），超时未观察到变化时返回 None"""
+        before = self._frame(region)
+        started = time.perf_counter()
+        action()
+
+        last, last_change_at, stable = before, None, 0
+        while time.perf_counter() - started < TRANSITION_TIMEOUT:
+            self._wait(FRAME_POLL_INTERVAL)
+            frame = self._frame(region)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            if last is None:
+                # 操作前没有截到画面，以第一帧为基准
+                last = frame
+                continue
+            if frame_difference(frame, last) > FRAME_CHANGE_RATIO:
+                last, last_change_at, stable = frame, now, 0
+            elif last_change_at is not None:
+                stable += 1
+                if stable >= STABLE_FRAMES:
+                    elapsed = last_change_at - started
+                    self.samples[transition].append(elapsed)
+                    if self.logger:
+                        self.logger.debug("校准 %s: %.0fms", transition, elapsed * 1000)
+                    return elapsed
+
+        if self.logger:
+            self.logger.warning("校准 %s 超时，未检测到画面变化", transition)
+        return None
+
+    def intervals(self, margin: float = DEFAULT_MARGIN) -> Dict[str, float]:
+        """各类切换的建议等待时间：最大实测值乘以安全系数"""
+        return {key: round(max(max(values) * margin, MIN_INTERVAL), 3)
+                for key, values in self.samples.items() if values}
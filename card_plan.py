@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+Region = Tuple[int, int, int, int]
+
+
+def get_center_position(region: List) -> Point:
+    """计算区域中心坐标"""
+    if not region or len(region) != 4:
+        raise ValueError("无效的区域配置")
+    return (region[0] + region[2] / 2, region[1] + region[3] / 2)
+
+
+def to_region(region: List) -> Optional[Region]:
+    """将区域配置转换为不可变元组（配置坐标，换算到屏幕由 WindowTracker 完成）"""
+    if not region or len(region) != 4:
+        return None
+    return (int(region[0]), int(region[1]), int(region[2]), int(region[3]))
+
+
+class _FrozenSlots:
+    """基于 __slots__ 的只读记录基类"""
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 为只读对象")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} 为只读对象")
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class LayoutPlan(_FrozenSlots):
+    """界面元素的预编译坐标"""
+    __slots__ = ('trade_point', 'buy_point', 'message_region', 'name_region', 'price_region',
+                 'quantity_region', 'total_price_region', 'refresh_point')
+
+    @classmethod
+    def compile(cls, ui_elements: Dict) -> 'LayoutPlan':
+        """根据 ui_elements 配置编译界面坐标"""
+        return cls(
+            trade_point=get_center_position(ui_elements['trade_btn']),
+            buy_point=get_center_position(ui_elements['buy_btn']),
+            message_region=to_region(ui_elements['message_region']),
+            name_region=to_region(ui_elements['product_name_location']),
+            price_region=to_region(ui_elements['product_price_location']),
+            quantity_region=to_region(ui_elements.get('quantity_input_location')),
+            total_price_region=to_region(ui_elements.get('total_price_location')),
+            refresh_point=get_center_position(ui_elements['refresh_btn']) if ui_elements.get('refresh_btn') else None,
+        )
+
+    @property
+    def supports_quantity(self) -> bool:
+        """是否配置了数量输入框和总价区域（一次购买多件所必需）"""
+        return self.quantity_region is not None and self.total_price_region is not None
+
+
+class CardPlan(_FrozenSlots):
+    """单个商品的预编译执行计划"""
+    __slots__ = ('index', 'name', 'normalized_name', 'click_point',
+                 'expect_price', 'tolerance', 'price_ceiling', 'buy_count', 'buy_quantity')
+
+    @classmethod
+    def compile(cls, index: int, card: Dict) -> 'CardPlan':
+        """将商品配置编译为执行计划"""
+        expect_price = card.get('expect_price', 0)
+        tolerance = card.get('floating_percentage_range', 0)
+        return cls(
+            index=index,
+            name=card['name'],
+            normalized_name=card['name'].replace(" ", ""),
+            click_point=get_center_position(card.get('position', [])),
+            expect_price=expect_price,
+            tolerance=tolerance,
+            price_ceiling=int(expect_price * (1 + tolerance)),
+            buy_count=card.get('buy_count', 0),
+            buy_quantity=max(1, int(card.get('buy_quantity', 1) or 1)),
+        )
+
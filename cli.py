@@ -0,0 +1,83 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+
+from config import set_config_path
+from engine_group import EngineGroup
+from ocr_server import OcrServerClient, DEFAULT_SLOT_COUNT
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+WAIT_POLL_INTERVAL = 0.2  # 主线程轮询间隔，保证 Ctrl+C 能及时响应
+STOP_WAIT_TIMEOUT = 10.0  # 停止时等待仍在加载OCR模型等启动步骤结束的最长时间
+
+
+def configure_cli_logger(log_file=None, verbose=False) -> logging.Logger:
+    """配置输出到标准输出（以及可选文件）的日志器"""
+    logger = logging.getLogger("app")
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    logger.addHandler(stream_handler)
+
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+    return logger
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="三角洲交易行抢购引擎（无界面运行）")
+    parser.add_argument("-c", "--config", help="配置文件路径，默认使用程序目录下的 config.json")
+    parser.add_argument("-l", "--log-file", help="日志文件路径")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    parser.add_argument("--ocr-server", action="store_true", help="在独立进程中运行OCR")
+    parser.add_argument("--ocr-pool-size", type=int, default=1, help="OCR服务进程中的引擎组数")
+    parser.add_argument("--ocr-shared-engine", action="store_true", help="OCR服务进程中中英文共用一个识别引擎")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.config:
+        set_config_path(os.path.abspath(args.config))
+    logger = configure_cli_logger(args.log_file, args.verbose)
+
+    ocr_service = None
+    if args.ocr_server:
+        ocr_service = OcrServerClient(size=args.ocr_pool_size, slot_count=DEFAULT_SLOT_COUNT, logger=logger,
+                                      shared=args.ocr_shared_engine)
+        ocr_service.start()
+
+    engine = EngineGroup(logger, ocr_service)
+    stopped = threading.Event()
+    engine.on_stopped = stopped.set
+    engine.on_bought = lambda index, card: logger.info(
+        "已购买: %s (%d/%d)", card['name'], card['already_buy_count'], card['buy_count'])
+    engine.on_progress = lambda step, total, phase: logger.info("启动 (%d/%d): %s", step, total, phase)
+    # 监控模式的价格提醒已由引擎写入日志，这里只在终端响铃
+    engine.on_alert = lambda index, name, price, ceiling: print("\a", end="", flush=True)
+
+    try:
+        engine.start()
+        while not stopped.wait(WAIT_POLL_INTERVAL):
+            pass
+    except KeyboardInterrupt:
+        logger.info("收到中断信号，正在停止")
+        engine.stop()
+        stopped.wait(STOP_WAIT_TIMEOUT)
+    finally:
+        engine.close()
+        if ocr_service:
+            ocr_service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import threading
+from collections import Counter
+from typing import Hashable, Optional
+
+DEFAULT_CONFIDENCE_THRESHOLDS = {
+    # 各区域识别结果的最低置信度，0 表示不把关；购买提示靠关键字判断且本身会持续采样，不在此列
+    'name': 0.80,
+    'price': 0.90,
+    'quantity': 0.90,
+    'total': 0.90,
+}
+DEFAULT_CONFIDENCE_RETRIES = 2  # 置信度不足时在当前页面上重新截图识别的次数
+CONFIDENCE_RETRY_INTERVAL = 0.005  # 两次重新截图之间的间隔（秒）
+REGION_NAMES = {'name': "名称", 'price': "价格", 'quantity': "数量", 'total': "总价"}
+
+
+def region_kind(key: Hashable) -> str:
+    """前置过滤的区域键（'name' 或 ('price', 商品序号)）对应的区域类别"""
+    return key if isinstance(key, str) else key[0]
+
+
+class ConfidenceStats:
+    """置信度把关计数：首次通过、重试后通过、重试次数和最终拒绝"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.accepted: Counter = Counter()
+        self.recovered: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.rejected: Counter = Counter()
+
+    def accept(self, kind: str, retries: int):
+        with self._lock:
+            self.accepted[kind] += 1
+            self.retries[kind] += retries
+            if retries:
+                self.recovered[kind] += 1
+
+    def reject(self, kind: str, retries: int):
+        with self._lock:
+            self.rejected[kind] += 1
+            self.retries[kind] += retries
+
+    def format_summary(self) -> Optional[str]:
+        with self._lock:
+            # 每个识别过的区域都输出通过、重试、拒绝三项计数
+            kinds = [kind for kind in REGION_NAMES if self.accepted[kind] or self.rejected[kind]]
+            parts = [f"{REGION_NAMES[kind]} 通过 {self.accepted[kind]} 次 (重试后通过 {self.recovered[kind]} 次) / "
+                     f"重试 {self.retries[kind]} 次 / 拒绝 {self.rejected[kind]} 次" for kind in kinds]
+        return " | ".join(parts) or None
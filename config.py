@@ -1,14 +1,25 @@
 import json
 import os
 import sys
+import threading
 
 from constants import CONFIG_PATH
 
+# 多个抢购线程可能同时回写配置，读写都需串行化
+_config_lock = threading.RLock()
+# 本进程写入配置的次数，文件修改时间精度不足时也能发现变化
+_config_version = 0
 
 def get_config_path():
     """获取 config.json 的路径"""
     return CONFIG_PATH
 
+
+def set_config_path(path):
+    """切换使用的配置文件（命令行运行时指定）"""
+    global CONFIG_PATH
+    CONFIG_PATH = path
+
 def check_or_create_config():
     """检查 config.json 是否存在，如果不存在则创建一个空的 config.json"""
     if not os.path.exists(CONFIG_PATH):
@@ -22,7 +33,7 @@ def check_or_create_config():
 def read_config_field(field, default=None):
     """读取 config.json 中指定字段的值"""
     try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        with _config_lock, open(CONFIG_PATH, "r", encoding="utf-8") as f:
             config = json.load(f)
         return config.get(field, default)
     except FileNotFoundError:
@@ -31,7 +42,7 @@ def read_config_field(field, default=None):
 def read_all_config():
     """读取 config.json 中所有字段的值"""
     try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        with _config_lock, open(CONFIG_PATH, "r", encoding="utf-8") as f:
             config = json.load(f)
         return config
     except FileNotFoundError:
@@ -40,15 +51,45 @@ def read_all_config():
 
 def write_config_field(field, value):
     """写入 config.json 中指定字段的值"""
-    try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            config = json.load(f)
-    except FileNotFoundError:
-        config = {}
+    update_config_field(field, lambda _: value)
+
+
+def update_config_field(field, updater, default=None):
+    """原子地读取-修改-写回 config.json 中指定字段，返回写入的值"""
+    with _config_lock:
+        try:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            config = {}
+
+        config[field] = updater(config.get(field, default))
+
+        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+        global _config_version
+        _config_version += 1
+        return config[field]
+
 
-    config[field] = value
+class ConfigWatcher:
+    """检测 config.json 是否变化（界面保存、其它实例回写或外部编辑）"""
 
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
+    def __init__(self):
+        self._stamp = self._current_stamp()
 
+    @staticmethod
+    def _current_stamp():
+        try:
+            stat = os.stat(CONFIG_PATH)
+        except FileNotFoundError:
+            return CONFIG_PATH, _config_version, None
+        return CONFIG_PATH, _config_version, stat.st_mtime_ns, stat.st_size
 
+    def changed(self) -> bool:
+        """自上次调用以来配置是否发生变化（一次 stat 调用）"""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
@@ -5,4 +5,6 @@ BASE_DIR = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
 
 CONFIG_PATH = os.path.join(BASE_DIR,"config.json")
 RESOURCE_PATH = os.path.join(BASE_DIR,"resources")
-ICON_PATH = os.path.join(RESOURCE_PATH,"images\icon.ico")
\ No newline at end of file
+ICON_PATH = os.path.join(RESOURCE_PATH,"images\icon.ico")
+PRICE_HISTORY_PATH = os.path.join(BASE_DIR,"price_history")
+FLIGHT_RECORDER_PATH = os.path.join(BASE_DIR,"flight_recorder")
@@ -0,0 +1,1295 @@
+import datetime
+import logging
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple
+
+import numpy as np
+
+from action_limiter import ActionLimiter, NAVIGATION, PURCHASE, REFRESH
+from calibration import TransitionCalibrator, default_transition_intervals, DEFAULT_CYCLES, DEFAULT_MARGIN
+from card_plan import CardPlan, LayoutPlan, Point, to_region, get_center_position
+from config import read_all_config, update_config_field, ConfigWatcher
+from confidence_gate import (ConfidenceStats, DEFAULT_CONFIDENCE_THRESHOLDS, DEFAULT_CONFIDENCE_RETRIES,
+                             CONFIDENCE_RETRY_INTERVAL)
+from constants import FLIGHT_RECORDER_PATH
+from flight_recorder import FlightRecorder, DEFAULT_FRAMES
+from frame_filter import FramePrefilter, FrameSignature
+from input_backend import InputBackend, create_input_backend, is_supported_key
+from market_monitor import MonitorStats, PriceAlerts, DEFAULT_ALERT_COOLDOWN, DEFAULT_CYCLE_INTERVAL
+from metrics import LatencyRecorder
+from ocr_pool import OcrEnginePool
+from price_history import PriceHistoryStore
+from purchase_flow import (FlowState, FlowStats, PurchaseAttempt, DEFAULT_STATE_TIMEOUTS, MAX_RECOVERY_STEPS,
+                           RECOVERY_ACTIONS)
+from utils import ScreenCapture, uses_window_origin
+from window_tracker import WindowTracker
+
+# 常量定义
+CONFIG_REQUIREMENTS = {
+    'regions': ['buy_message_location', 'trade_btn_location', 'product_name_location', 'product_price_location'],
+}
+UI_DELAY = 0.1
+MAX_THREAD_JOIN_TIMEOUT = 0.1  # 所有等待都可被中断，停止应在 100ms 内完成
+OCR_POLL_INTERVAL = 0.02  # 等待OCR结果时检查停止信号的间隔
+PURCHASE_POLL_INTERVAL = 0.03  # 购买结果两次采样之间的间隔
+PURCHASE_SUCCESS_KEYWORDS = ("购买成功",)
+PURCHASE_FAILURE_KEYWORDS = ("购买失败", "不足", "售罄", "已下架", "价格变动")
+START_PHASES = ("读取配置", "加载OCR引擎", "激活游戏窗口", "进入交易行", "准备待购清单")
+CONFIRM_SUMMARY_EVERY = 10  # 每确认多少次输出一次耗时分布
+SCREENSHOT_THRESHOLD = 100
+PRICE_THRESHOLD = 55
+QUANTITY_CLEAR_KEYS = 4  # 输入购买数量前按退格清空输入框的次数
+
+class PurchaseCancelled(BaseException):
+    """停止信号触发时在检查点抛出，继承 BaseException 以穿过各处的 except Exception"""
+
+
+class InstanceLoggerAdapter(logging.LoggerAdapter):
+    """多实例时在日志前加上实例序号"""
+
+    def process(self, msg, kwargs):
+        return f"[实例{self.extra['instance']}] {msg}", kwargs
+
+
+class PurchaseEngine:
+    """
+    自动抢购核心逻辑控制器（不依赖 PyQt）
+
+    状态变化通过 on_stopped() / on_bought(index, card) 回调通知，启动过程通过
+    on_progress(step, total, phase) 和 on_ready() 通知，监控模式下价格不高于上限时调用
+    on_alert(index, name, price, ceiling)，回调在工作线程或调用 stop() 的线程中执行。
+    """
+
+    def __init__(self, logger: logging.Logger,
+                 input_backend: Optional[InputBackend] = None,
+                 ocr_pool: Optional[OcrEnginePool] = None,
+                 instance_index: Optional[int] = None,
+                 input_lock: Optional[threading.Lock] = None,
+                 capture: Optional[ScreenCapture] = None,
+                 window_tracker: Optional[WindowTracker] = None,
+                 price_history: Optional[PriceHistoryStore] = None):
+        if instance_index is not None:
+            logger = InstanceLoggerAdapter(logger, {'instance': instance_index})
+        self.logger = logger
+        self.on_stopped: Optional[Callable[[], None]] = None
+        self.on_bought: Optional[Callable[[int, Dict], None]] = None
+        self.on_progress: Optional[Callable[[int, int, str], None]] = None
+        self.on_ready: Optional[Callable[[], None]] = None
+        self.on_alert: Optional[Callable[[int, str, int, int], None]] = None
+        self.instance_index = instance_index
+        self._injected_input = input_backend
+        self._input: Optional[InputBackend] = input_backend
+        self._input_lock = input_lock or threading.Lock()
+        self._capture_source = capture or ScreenCapture()
+        self._injected_tracker = window_tracker
+        self._tracker: Optional[WindowTracker] = window_tracker
+        self._price_history = price_history
+        self._exclusive_window = False
+        self._init_ocr_models(ocr_pool)
+        self._runtime_config: Dict[str, Any] = {}
+        self._stop_event = threading.Event()
+        self._cancel_deferred = False  # 已点击购买、结果尚未记账时暂不响应停止信号
+        self._worker_thread: Optional[threading.Thread] = None
+        self._layout: Optional[LayoutPlan] = None
+        self._card_plans: List[CardPlan] = []
+        self._active_plans: List[CardPlan] = []
+        self._visited_names: Set[str] = set()  # 本轮已处理过的商品名称，单轮模式热更新时不再重复处理
+        self._page_open = False
+        self._page_identity: Optional[Tuple[int, bytes]] = None  # 停留模式下当前商品页的 (商品序号, 名称区域摘要)
+        self._config_watcher: Optional[ConfigWatcher] = None
+        self.confirm_latency = LatencyRecorder()
+        self.flow_stats = FlowStats()
+        self.confidence_stats = ConfidenceStats()
+        self.monitor_stats = MonitorStats()
+        self._price_alerts = PriceAlerts()
+        self.prefilter = FramePrefilter()
+        self._limiter = ActionLimiter()
+        self.flight_recorder: Optional[FlightRecorder] = None
+        self._setup_display_params()
+
+    def _init_ocr_models(self, ocr_pool: Optional[OcrEnginePool]):
+        """初始化OCR引擎池（多实例时由外部共享传入）"""
+        self._ocr = ocr_pool or OcrEnginePool(logger=self.logger)
+        self._ocr_acquired = False
+        self._resource_lock = threading.Lock()
+
+    def _setup_display_params(self):
+        """初始化显示相关参数"""
+        self.screen_width, self.screen_height = self._capture_source.size()
+        self.logger.debug(f"屏幕分辨率: {self.screen_width}x{self.screen_height}")
+
+    def refresh_config(self):
+        """刷新运行时配置"""
+        try:
+            # 先记录文件状态再读取，读取之后的修改都会被热更新发现
+            self._config_watcher = ConfigWatcher()
+            config = read_all_config()
+            instance = self._resolve_instance(config)
+            self._validate_config(config, instance)
+            self._bind_game_window(config, instance)
+
+            self._runtime_config = self._build_runtime_config(config, instance)
+            self._compile_plans()
+            self._setup_input_backend()
+            self._limiter.configure(self._runtime_config['action_rate_limits'])
+            self._setup_flight_recorder(config)
+
+            self.logger.info("配置刷新成功")
+        except Exception as e:
+            self.logger.error("配置刷新失败: %s", str(e))
+            raise
+
+    def _build_runtime_config(self, config: Dict, instance: Dict) -> Dict[str, Any]:
+        """从配置文件内容生成运行时配置"""
+        return {
+            'operation_mode': {
+                'is_loop': config.get("is_loop", False),
+                'is_debug': config.get("is_debug", False)
+            },
+            'ui_elements': {
+                'trade_btn': config.get("trade_btn_location", []),
+                'buy_btn': config.get("buy_btn_location", [0.825, 0.86]),
+                'message_region': config.get("buy_message_location", []),
+                'product_name_location': config.get("product_name_location", []),
+                'product_price_location': config.get("product_price_location", []),
+                'quantity_input_location': config.get("quantity_input_location", []),
+                'total_price_location': config.get("total_price_location", []),
+                'refresh_btn': config.get("refresh_location", [])
+            },
+            'products': instance.get("products", []),
+            'screen': (self.screen_width, self.screen_height),
+            'input': {
+                'backend': config.get("input_backend", "direct"),
+                'click_hold_interval': config.get("click_hold_interval", 0.0)
+            },
+            'exec_interval': config.get("exec_interval", 0.1),
+            'premove_cursor': config.get("premove_cursor", True),
+            'monitor': {
+                'enabled': config.get("monitor_mode", False),
+                'cycle_interval': config.get("monitor_cycle_interval", DEFAULT_CYCLE_INTERVAL),
+                'alert_cooldown': config.get("monitor_alert_cooldown", DEFAULT_ALERT_COOLDOWN)
+            },
+            'stay_on_page': {
+                'enabled': config.get("stay_on_page", False),
+                'refresh_key': config.get("refresh_key", "f5")
+            },
+            # 各类界面切换后的等待时间，未校准的项回退到由 exec_interval 推算的默认值
+            'transition_intervals': {
+                **default_transition_intervals(config.get("exec_interval", 0.1)),
+                **config.get("transition_intervals", {})
+            },
+            'calibration': {
+                'enabled': config.get("calibrate_on_start", False),
+                'cycles': config.get("calibration_cycles", DEFAULT_CYCLES),
+                'margin': config.get("calibration_margin", DEFAULT_MARGIN)
+            },
+            'buy_confirm_interval': config.get("buy_confirm_interval", 0.5),
+            'state_timeouts': {**DEFAULT_STATE_TIMEOUTS, **config.get("state_timeouts", {})},
+            'ocr_prefilter': config.get("ocr_prefilter", True),
+            'ocr_confidence': {
+                'thresholds': {**DEFAULT_CONFIDENCE_THRESHOLDS, **config.get("ocr_confidence_thresholds", {})},
+                'retries': config.get("ocr_confidence_retries", DEFAULT_CONFIDENCE_RETRIES)
+            },
+            'action_rate_limits': config.get("action_rate_limits", {}),
+            'flight_recorder_frames': config.get("flight_recorder_frames", DEFAULT_FRAMES)
+        }
+
+    def _apply_config_changes(self) -> bool:
+        """
+        热更新：配置文件变化时重新生成运行时配置和执行计划，并在两个商品之间整体替换
+
+        以文件内容为准（界面会同步已购数量，清空已购数量也会立即生效）。
+        窗口绑定方式的变化需要重新启动才会生效。返回是否替换了执行计划。
+        """
+        if self._config_watcher is None or not self._config_watcher.changed():
+            return False
+        try:
+            config = read_all_config()
+            instance = self._resolve_instance(config)
+            self._validate_config(config, instance)
+            runtime_config = self._build_runtime_config(config, instance)
+        except Exception as e:
+            self.logger.warning("配置热更新失败，继续使用当前配置: %s", str(e))
+            return False
+
+        if runtime_config == self._runtime_config:
+            return False
+
+        changed = [key for key in runtime_config if runtime_config[key] != self._runtime_config.get(key)]
+        previous_plans = {plan.name for plan in self._card_plans}
+        active_names = {plan.name for plan in self._active_plans}
+        previous_input = self._runtime_config['input']
+
+        self._runtime_config = runtime_config
+        self._compile_plans()
+        # 商品序号和区域可能已变化，停留中的商品页不再可信，下次处理时关闭后重新进入并校验名称
+        self._page_identity = None
+        if runtime_config['operation_mode']['is_loop'] or self._monitoring():
+            self._active_plans = list(self._card_plans)
+        else:
+            # 单轮模式下本轮已处理过（包括未买到）的商品不再重新加入
+            self._active_plans = [plan for plan in self._card_plans
+                                  if plan.name not in self._visited_names
+                                  and (plan.name in active_names or plan.name not in previous_plans)]
+        if runtime_config['input'] != previous_input:
+            self._setup_input_backend()
+        if 'action_rate_limits' in changed:
+            self._limiter.configure(runtime_config['action_rate_limits'])
+        if 'flight_recorder_frames' in changed:
+            self._setup_flight_recorder(config)
+
+        self.logger.info("配置已热更新: %s，待购清单: %s",
+                         changed, [plan.name for plan in self._active_plans])
+        return True
+
+    def _resolve_instance(self, config: Dict) -> Dict:
+        """获取当前实例的配置，单实例模式下即为根配置"""
+        if self.instance_index is None:
+            return config
+        instances = config.get("instances", [])
+        if self.instance_index >= len(instances):
+            raise ValueError(f"未找到实例配置: {self.instance_index}")
+        return instances[self.instance_index]
+
+    def _validate_config(self, config: Dict, instance: Dict):
+        """验证必要配置项完整性"""
+        missing = [key for key in CONFIG_REQUIREMENTS['regions']
+                   if not self._is_valid_region(config.get(key))]
+        if missing:
+            raise ValueError(f"缺少必要区域配置: {missing}")
+
+        valid_products = len(instance.get("products", [])) != 0
+        if not valid_products:
+            raise ValueError("未找到有效商品配置")
+
+        # 刷新按键在停留模式运行中才会用到，加载配置时就检查，不在抢购途中才发现无法发送
+        refresh_key = config.get("refresh_key", "f5")
+        if not is_supported_key(refresh_key):
+            raise ValueError(f"不支持的刷新按键: {refresh_key}（可用字母、数字、f1~f12、esc、enter、tab、space、backspace）")
+
+    def _bind_game_window(self, config: Dict, instance: Dict):
+        """绑定游戏窗口，句柄与位置由 WindowTracker 缓存跟踪"""
+        if self._injected_tracker is not None:
+            return
+        relative = uses_window_origin(config)
+        anchor = None if relative else config.get("region_window_origin")
+        anchor = tuple(anchor) if anchor else None
+        if self.instance_index is None:
+            title, index = None, 0
+        else:
+            title, index = instance.get("window_title"), instance.get("window_index", self.instance_index)
+
+        tracker = self._tracker
+        if tracker is None or (tracker.title, tracker.index, tracker.relative, tracker.anchor) \
+                != (title, index, relative, anchor):
+            self._tracker = WindowTracker(title, index, relative, self.logger, anchor)
+        # 窗口相对坐标模式下多个实例共享鼠标键盘，每次操作前需切换到自己的窗口
+        self._exclusive_window = relative
+
+        if not self._tracker.resolve() and relative:
+            raise RuntimeError(f"未找到游戏窗口: {title or index}")
+
+    def _compile_plans(self):
+        """将界面配置和启用的商品编译为只读执行计划"""
+        self._layout = LayoutPlan.compile(self._runtime_config['ui_elements'])
+
+        plans = []
+        for index, card in enumerate(self._runtime_config['products']):
+            # 监控模式不购买，已买够的商品也继续查看价格
+            if not card.get('enable_buy', False) or not self._monitoring() \
+                    and card.get('buy_count', 0) <= card.get('already_buy_count', 0):
+                continue
+            try:
+                plans.append(CardPlan.compile(index, card))
+            except ValueError as e:
+                self.logger.warning("商品配置无效，已跳过: %s - %s", card.get('name'), str(e))
+        self._card_plans = plans
+        if not self._layout.supports_quantity and any(plan.buy_quantity > 1 for plan in plans):
+            self.logger.warning("未配置数量输入框和总价区域，每次只购买 1 件")
+
+    def _setup_input_backend(self):
+        """根据配置创建输入后端（外部注入的后端优先）"""
+        if self._injected_input is not None:
+            return
+        input_config = self._runtime_config['input']
+        self._input = create_input_backend(input_config['backend'],
+                                           input_config['click_hold_interval'])
+        if self._input.name != input_config['backend']:
+            self.logger.warning("输入后端 %s 不可用，已回退到 %s",
+                                       input_config['backend'], self._input.name)
+        self.logger.debug("输入后端: %s", self._input.name)
+
+    def _setup_flight_recorder(self, config: Dict):
+        """按配置创建截图飞行记录器，flight_recorder_frames 为 0 时关闭"""
+        frames = self._runtime_config['flight_recorder_frames']
+        if frames <= 0:
+            self.flight_recorder = None
+            return
+        if self.flight_recorder is None or self.flight_recorder.capacity != frames:
+            directory = config.get("flight_recorder_path", FLIGHT_RECORDER_PATH)
+            if self.instance_index is not None:
+                directory = os.path.join(directory, f"instance_{self.instance_index}")
+            self.flight_recorder = FlightRecorder(directory, frames, logger=self.logger)
+
+    def _dump_frames(self, reason: str, **details):
+        """失败时转储最近的截图和OCR结果"""
+        if self.flight_recorder is not None:
+            self.flight_recorder.dump(reason, details)
+
+    @staticmethod
+    def _is_valid_region(region: List) -> bool:
+        """验证区域配置有效性"""
+        return len(region) == 4 if region else False
+
+    def is_running(self) -> bool:
+        """工作线程是否在运行"""
+        return bool(self._worker_thread and self._worker_thread.is_alive())
+
+    def start(self):
+        """启动抢购流程：启动准备也在工作线程中执行，调用方（界面线程、热键线程）不会被阻塞"""
+        if self.is_running():
+            self.logger.warning("操作线程已在运行中")
+            return
+
+        self._stop_event.clear()
+        self._worker_thread = threading.Thread(
+            target=self._run,
+            daemon=True
+        )
+        self._worker_thread.start()
+
+    def _run(self):
+        """工作线程入口：启动准备完成后进入抢购主流程，准备失败或被取消时清理退出"""
+        try:
+            self._prepare_operation()
+        except PurchaseCancelled:
+            self.logger.info("启动已取消")
+            if self._page_open:
+                self._close_open_page()
+            self._shutdown()
+            return
+        except Exception as e:
+            s = traceback.format_exc()
+            self.logger.error("启动失败: %s", str(e))
+            self.logger.error("详细错误信息: %s", s)
+            self._shutdown()
+            return
+
+        self.logger.info("抢购流程已启动")
+        if self.on_ready:
+            self.on_ready()
+        self._purchase_workflow()
+
+    def _report_progress(self, step: int):
+        """通知启动进度，每个阶段开始前调用，阶段之间响应停止信号"""
+        self._checkpoint()
+        phase = START_PHASES[step]
+        self.logger.debug("启动阶段 %d/%d: %s", step + 1, len(START_PHASES), phase)
+        if self.on_progress:
+            self.on_progress(step + 1, len(START_PHASES), phase)
+
+    def _prepare_operation(self):
+        """执行操作前准备"""
+        self._report_progress(0)
+        self.refresh_config()
+        self._report_progress(1)
+        self._init_ocr_engines()
+
+        self._report_progress(2)
+        if not self._tracker.activate():
+            raise RuntimeError("游戏窗口切换失败")
+
+        self._report_progress(3)
+        if self._runtime_config['calibration']['enabled']:
+            self._calibrate_transitions()
+        else:
+            self._switch_to_trading()
+        self._report_progress(4)
+        self._prepare_shopping_list()
+        self.logger.info("操作准备就绪")
+
+    def _init_ocr_engines(self):
+        """初始化OCR识别引擎"""
+        try:
+            with self._resource_lock:
+                if not self._ocr_acquired:
+                    self._ocr.acquire()
+                    self._ocr_acquired = True
+
+            self.logger.debug("OCR引擎初始化成功")
+        except Exception as e:
+            self.logger.error("OCR引擎初始化失败: %s", str(e))
+            raise e
+
+    def _switch_to_trading(self):
+        """切换到交易行界面"""
+        x, y = self._layout.trade_point
+        self._perform_click(x, y, transition='trade')
+        self.logger.info("已进入交易行")
+
+    def _calibrate_transitions(self):
+        """启动校准：实测进入交易行、打开和关闭商品页的界面稳定时间，加上安全系数后写回配置"""
+        if self._runtime_config['operation_mode']['is_debug'] or not self._card_plans:
+            self.logger.warning("调试模式或没有启用的商品，跳过校准")
+            self._switch_to_trading()
+            return
+
+        settings = self._runtime_config['calibration']
+        plan = self._card_plans[0]
+        list_region = to_region(self._runtime_config['products'][plan.index].get('position'))
+        calibrator = TransitionCalibrator(lambda region: self._capture(region, SCREENSHOT_THRESHOLD),
+                                          self._wait, self.logger)
+        self.logger.info("开始校准界面切换间隔 (%d 轮)", settings['cycles'])
+
+        x, y = self._layout.trade_point
+        calibrator.measure('trade', lambda: self._perform_click(x, y), list_region)
+        self.logger.info("已进入交易行")
+        for _ in range(settings['cycles']):
+            if calibrator.measure('open_product', lambda: self._open_product_page(plan),
+                                  self._layout.name_region) is None:
+                # 商品页没有打开时按 ESC 会离开交易行，之后的测量都不可信
+                self._page_open = False
+                self.logger.warning("未检测到商品页打开，校准已中止，继续使用当前间隔")
+                return
+            calibrator.measure('close', self._close_page, self._layout.name_region)
+
+        intervals = calibrator.intervals(settings['margin'])
+        if not intervals:
+            self.logger.warning("校准未得到有效结果，继续使用当前间隔")
+            return
+        self._runtime_config['transition_intervals'].update(intervals)
+        update_config_field("transition_intervals", lambda current: {**(current or {}), **intervals}, {})
+        self.logger.info("校准完成: %s", {key: f"{value * 1000:.0f}ms" for key, value in intervals.items()})
+
+    def _prepare_shopping_list(self):
+        """准备待购商品列表"""
+        self._active_plans = list(self._card_plans)
+
+        if not self._active_plans:
+            raise ValueError("没有有效的购买目标")
+
+        self.logger.info("%s: %s", "监控清单（只查看价格，不购买）" if self._monitoring() else "待购清单",
+                    [plan.name for plan in self._active_plans])
+
+    def _purchase_workflow(self):
+        """商品抢购主流程，监控模式下不停地轮流查看所有商品的价格"""
+        try:
+            reloaded = False
+            while self._active_plans:
+                if not reloaded:
+                    self._visited_names.clear()
+                reloaded = False
+                cycle_started = time.perf_counter()
+                for plan in tuple(self._active_plans):
+                    self._checkpoint()
+                    if self._apply_config_changes():
+                        # 执行计划已整体替换，从新清单的开头继续
+                        reloaded = True
+                        break
+                    self._process_single_card(plan)
+                    self._visited_names.add(plan.name)
+                    self._cleanup_inactive_cards()
+
+                if self._monitoring():
+                    if not reloaded:
+                        self.monitor_stats.cycle(time.perf_counter() - cycle_started)
+                        self._wait(self._runtime_config['monitor']['cycle_interval'])
+                    continue
+                if not reloaded and not self._runtime_config['operation_mode']['is_loop']:
+                    break
+
+        except PurchaseCancelled:
+            self._close_open_page()
+        except Exception as e:
+            self.logger.error("抢购流程异常: %s", str(e))
+        finally:
+            self._shutdown()
+
+    def _process_single_card(self, plan: CardPlan):
+        """处理单个商品购买流程"""
+        if not self._monitoring():
+            self.logger.info("正在处理商品: %s", plan.name)
+
+        try:
+            if self._attempt_purchase(plan):
+                self._handle_success_purchase(plan)
+                if not self._runtime_config['operation_mode']['is_loop']:
+                    self._active_plans.remove(plan)
+        except Exception as e:
+            self.logger.error("商品处理失败: %s - %s", plan.name, str(e))
+
+    def _attempt_purchase(self, plan: CardPlan) -> bool:
+        """
+        按状态机执行一次购买尝试：交易行 → 商品页 → 等待购买结果 → 购买结果 → 交易行
+
+        每个状态有自己的超时，出现意外界面时先识别当前界面，再按最短路径回到交易行，
+        而不是重复整个导航流程。返回本次是否购买成功。
+        """
+        attempt = PurchaseAttempt(plan)
+        handlers = {
+            FlowState.HALL: self._step_hall,
+            FlowState.PRODUCT: self._step_monitor if self._monitoring() else self._step_product,
+            FlowState.CONFIRM: self._step_confirm,
+            FlowState.RESULT: self._step_result,
+        }
+        state = FlowState.PRODUCT if self._refresh_product_page(plan) else FlowState.HALL
+        while state is not None:
+            if state is not FlowState.CONFIRM:  # 购买已点出时先确认结果再响应停止
+                self._checkpoint()
+            state = handlers[state](attempt)
+        return attempt.bought
+
+    def _step_hall(self, attempt: PurchaseAttempt) -> Optional[FlowState]:
+        """交易行：点击商品，等待商品页出现预期的商品名称"""
+        plan = attempt.plan
+        opened_at = time.perf_counter()
+        self._open_product_page(plan)
+        self._premove(self._purchase_target(plan))
+        self._settle('open_product')
+        detected_name, confident = self._await_product_page(plan, opened_at)
+
+        if confident and self._name_matches(detected_name, plan):
+            if self._staying_on_page():
+                self._remember_page(plan)
+            return FlowState.PRODUCT
+
+        self.flow_stats.timeout(FlowState.PRODUCT)
+        if not detected_name:
+            self.logger.warning("未能识别商品名称")
+            self._dump_frames("未能识别商品名称", card=plan.name)
+            self._recover(FlowState.UNKNOWN)
+        elif not confident:
+            self.logger.warning("商品名称置信度过低 (识别: %s)", detected_name)
+            self._dump_frames("商品名称置信度过低", card=plan.name, detected=detected_name)
+            self._recover(FlowState.PRODUCT)
+        else:
+            self.logger.warning("商品不匹配 (识别: %s / 预期: %s)",
+                                detected_name, plan.normalized_name)
+            self._dump_frames("商品不匹配", card=plan.name, detected=detected_name)
+            self._recover(FlowState.PRODUCT)
+        return None
+
+    def _step_product(self, attempt: PurchaseAttempt) -> Optional[FlowState]:
+        """商品页：识别价格，可接受时点击购买"""
+        plan = attempt.plan
+        price_info = self._get_price_information(plan)
+        if price_info.get('low_confidence'):
+            # 画面可能还在刷新，不按识别失败处理：停留模式下直接等下一次刷新，否则关闭商品页
+            self.logger.info("价格置信度过低，放弃本次 (识别: %s / 置信度 %.2f)",
+                             price_info['raw_text'], price_info['confidence'])
+            if self._page_identity is None:
+                self._cancel_operation(self._next_target(plan))
+            return None
+        if not price_info['valid']:
+            self._dump_frames("价格识别失败", card=plan.name)
+            self._recover(FlowState.PRODUCT)
+            return None
+        self._record_price(plan, price_info)
+
+        if not self._is_acceptable_price(price_info, plan):
+            self.logger.info("价格超出接受范围")
+            if self._page_identity is None:
+                self._cancel_operation(self._next_target(plan))
+            return None
+
+        quantity = self._purchase_quantity(plan)
+        if quantity > 1:
+            price_info = self._set_quantity(plan, price_info, quantity)
+            if price_info is None:
+                self._recover(FlowState.PRODUCT)
+                return None
+
+        attempt.price_info = price_info
+        attempt.baseline = self._capture_message()
+        x, y = self._layout.buy_point
+        self._perform_click(x, y, action=PURCHASE)
+        if self._runtime_config['operation_mode']['is_debug']:
+            # 调试模式只移动光标、不会点出购买，没有结果可等也不能记账
+            self.logger.info("调试模式，跳过购买确认")
+            self._cancel_operation(self._next_target(plan))
+            return None
+        attempt.clicked_at = time.perf_counter()
+        return FlowState.CONFIRM
+
+    def _step_monitor(self, attempt: PurchaseAttempt) -> Optional[FlowState]:
+        """监控模式的商品页：只识别并记录价格，不高于价格上限时提醒，随即离开，不等待任何购买结果"""
+        plan = attempt.plan
+        price_info = self._get_price_information(plan)
+        if not price_info['valid']:
+            if not price_info.get('low_confidence'):
+                self._dump_frames("价格识别失败", card=plan.name)
+                self._recover(FlowState.PRODUCT)
+                return None
+        else:
+            self.monitor_stats.checked()
+            self._record_price(plan, price_info)
+            if self._is_acceptable_price(price_info, plan):
+                self._alert(plan, price_info['numeric_value'])
+        if self._page_identity is None:
+            self._cancel_operation(self._next_target(plan))
+        return None
+
+    def _monitoring(self) -> bool:
+        """是否为只查看价格的监控模式"""
+        return self._runtime_config['monitor']['enabled']
+
+    def _record_price(self, plan: CardPlan, price_info: Dict):
+        """记录识别到的价格"""
+        if self._price_history is not None:
+            self._price_history.record(plan.name, price_info['numeric_value'], price_info['confidence'])
+
+    def _alert(self, plan: CardPlan, price: int):
+        """价格不高于上限时提醒，同一商品的重复提醒按 monitor_alert_cooldown 去重"""
+        if not self._price_alerts.should_alert(plan.name, price, self._runtime_config['monitor']['alert_cooldown']):
+            return
+        self.monitor_stats.alerted()
+        self.logger.warning("价格提醒: %s 当前价格 %d，不高于上限 %d", plan.name, price, plan.price_ceiling)
+        if self.on_alert:
+            self.on_alert(plan.index, plan.name, price, plan.price_ceiling)
+
+    def _purchase_quantity(self, plan: CardPlan) -> int:
+        """本次购买的件数：每次购买数量与剩余数量中的较小值，未配置数量区域时为 1"""
+        if plan.buy_quantity <= 1 or not self._layout.supports_quantity:
+            return 1
+        bought = self._runtime_config['products'][plan.index].get('already_buy_count', 0)
+        return max(1, min(plan.buy_quantity, plan.buy_count - bought))
+
+    def _set_quantity(self, plan: CardPlan, price_info: Dict, quantity: int) -> Optional[Dict]:
+        """
+        输入购买数量，等待数量和总价刷新后校验总价，返回本次购买的价格信息（numeric_value 为平均单价）
+
+        总价不低于单价乘以数量才视为已刷新；总价超过价格上限乘以数量时退回只买 1 件，无法确认数量时返回 None。
+        """
+        self._enter_quantity(quantity)
+        deadline = time.perf_counter() + self._runtime_config['state_timeouts']['quantity']
+        while True:
+            entered = self._read_confident_number(self._layout.quantity_region, ('quantity', plan.index))
+            total = self._read_confident_number(self._layout.total_price_region, ('total', plan.index))
+            if entered['valid'] and entered['numeric_value'] == quantity and total['valid'] \
+                    and total['numeric_value'] >= price_info['numeric_value'] * quantity:
+                break
+            if time.perf_counter() >= deadline:
+                self.logger.warning("购买数量设置失败 (预期: %d / 识别: %s)", quantity, entered.get('raw_text'))
+                self._dump_frames("购买数量设置失败", card=plan.name, quantity=quantity)
+                return None
+            self._wait(min(PURCHASE_POLL_INTERVAL, max(deadline - time.perf_counter(), 0)))
+
+        total_price = total['numeric_value']
+        if total_price > plan.price_ceiling * quantity:
+            self.logger.info("总价超出接受范围 (%d 件 / 总价 %d)", quantity, total_price)
+            return self._set_quantity(plan, price_info, 1) if quantity > 1 else None
+        return {**price_info, 'numeric_value': round(total_price / quantity),
+                'quantity': quantity, 'total': total_price}
+
+    def _enter_quantity(self, quantity: int):
+        """点击数量输入框，清空后输入购买数量"""
+        x, y = get_center_position(self._layout.quantity_region)
+        self._perform_click(x, y)
+        if self._runtime_config['operation_mode']['is_debug']:
+            return
+        self._checkpoint()
+        self._limiter.acquire(NAVIGATION, self._wait)
+        with self._input_lock:
+            self._ensure_foreground()
+            for key in ['backspace'] * QUANTITY_CLEAR_KEYS + list(str(quantity)):
+                self._input.press(key)
+
+    def _step_confirm(self, attempt: PurchaseAttempt) -> Optional[FlowState]:
+        """
+        等待购买结果并记账：超时后再识别一次，结论出现得晚时仍按结果处理
+
+        购买已经点出，这一步不可取消（最长约 buy_confirm_interval），避免买到的商品没有计入已购数量。
+        停止时仍没有结论则不记账，只提示结果未知，由用户在游戏内核对。
+        """
+        with self._defer_cancel():
+            attempt.verdict = self._confirm_purchase_success(attempt.clicked_at, attempt.baseline)
+            screen = FlowState.RESULT
+            if attempt.verdict is None:
+                self.flow_stats.timeout(FlowState.RESULT)
+                attempt.verdict = self._read_purchase_verdict(attempt.baseline)
+                if attempt.verdict is not None:
+                    self.logger.info("购买结果在超时后出现 (%s)", "成功" if attempt.verdict else "失败")
+                elif self._stop_event.is_set():
+                    self.logger.warning("停止时未能确认 %s 的购买结果，未计入已购数量，请在游戏内核对",
+                                        attempt.plan.name)
+                    return None
+                else:
+                    screen = self._classify_screen(attempt.baseline)
+            if attempt.verdict:
+                self._record_transaction(attempt.plan, attempt.price_info)
+                attempt.bought = True
+
+        if attempt.verdict is None:
+            self._recover(screen)
+            return None
+        return FlowState.RESULT
+
+    def _step_result(self, attempt: PurchaseAttempt) -> Optional[FlowState]:
+        """购买结果：无论成败都关闭商品页（失败提示不关闭会一直留在画面上）"""
+        self._cancel_operation(self._next_target(attempt.plan))
+        return None
+
+    def _purchase_target(self, plan: CardPlan) -> Optional[Point]:
+        """商品页上下一个点击目标：一次买多件时为数量输入框，否则为购买按钮；监控模式下不购买，为离开后的目标"""
+        if self._monitoring():
+            return self._next_target(plan)
+        if self._purchase_quantity(plan) > 1:
+            return get_center_position(self._layout.quantity_region)
+        return self._layout.buy_point
+
+    def _next_target(self, plan: CardPlan) -> Optional[Point]:
+        """关闭商品页后的下一个点击目标：停留模式下为刷新按钮（可能未配置），否则为下一个待购商品"""
+        if self._staying_on_page():
+            return self._layout.refresh_point
+        plans = self._active_plans
+        if not plans:
+            return None
+        position = plans.index(plan) + 1 if plan in plans else 0
+        return plans[position % len(plans)].click_point
+
+    def _staying_on_page(self) -> bool:
+        """停留模式：循环模式（或监控模式）下只剩一个商品时留在商品页内刷新，不再退出重进"""
+        return self._runtime_config['stay_on_page']['enabled'] and len(self._active_plans) == 1 \
+            and (self._runtime_config['operation_mode']['is_loop'] or self._monitoring())
+
+    def _refresh_product_page(self, plan: CardPlan) -> bool:
+        """
+        停留模式下在商品页内刷新，刷新后仍是该商品的页面时返回 True（直接从商品页状态开始）
+
+        名称区域与上次校验通过时的画面完全一致则跳过名称识别，只重新识别价格。
+        不在停留模式或停留的不是该商品时，先关闭仍打开的商品页再从交易行开始。
+        """
+        identity = self._page_identity
+        if identity is None or identity[0] != plan.index or not self._page_open or not self._staying_on_page():
+            if self._page_open:
+                self._cancel_operation()
+            return False
+
+        refreshed_at = time.perf_counter()
+        self._refresh_page()
+        self._premove(self._purchase_target(plan))
+        self._settle('refresh')
+        signature = self._name_signature()
+        if signature is not None and signature.digest == identity[1]:
+            self.flow_stats.refreshed(identity_unchanged=True)
+            return True
+
+        self.flow_stats.refreshed(identity_unchanged=False)
+        detected_name, confident = self._await_product_page(plan, refreshed_at)
+        if confident and self._name_matches(detected_name, plan):
+            self._remember_page(plan)
+            return True
+        self.logger.warning("刷新后商品页已变化 (识别: %s)", detected_name)
+        self._page_identity = None
+        self._recover(self._classify_screen())
+        return False
+
+    def _refresh_page(self):
+        """触发商品页内刷新：配置了刷新按钮位置时点击，否则按刷新键"""
+        if self._layout.refresh_point is not None:
+            x, y = self._layout.refresh_point
+            self._perform_click(x, y, action=REFRESH)
+            return
+        self._checkpoint()
+        self._limiter.acquire(REFRESH, self._wait)
+        with self._input_lock:
+            self._ensure_foreground()
+            self._input.press(self._runtime_config['stay_on_page']['refresh_key'])
+
+    def _name_signature(self) -> Optional[FrameSignature]:
+        """名称区域的画面特征，作为商品页身份"""
+        screenshot = self._capture(self._layout.name_region, SCREENSHOT_THRESHOLD)
+        return FrameSignature(np.array(screenshot), SCREENSHOT_THRESHOLD) if screenshot else None
+
+    def _remember_page(self, plan: CardPlan):
+        """记录校验通过的商品页身份"""
+        signature = self._name_signature()
+        self._page_identity = (plan.index, signature.digest) if signature is not None else None
+
+    def _await_product_page(self, plan: CardPlan, opened_at: float) -> Tuple[Optional[str], bool]:
+        """
+        轮询名称区域直到以足够的置信度识别出预期商品或超过 product 超时，
+        返回最后识别到的名称及其置信度是否达标
+        """
+        key = ('name', plan.index)
+        deadline = opened_at + self._runtime_config['state_timeouts']['product']
+        while True:
+            detected_name, confident = self._read_confident('name', lambda: self._read_product_name(key))
+            if (confident and self._name_matches(detected_name, plan)) or time.perf_counter() >= deadline:
+                return detected_name, confident
+            self._wait(min(PURCHASE_POLL_INTERVAL, max(deadline - time.perf_counter(), 0)))
+
+    @staticmethod
+    def _name_matches(detected_name: Optional[str], plan: CardPlan) -> bool:
+        """识别到的名称是否为预期商品"""
+        return bool(detected_name) and detected_name in plan.normalized_name
+
+    def _classify_screen(self, baseline: Optional[np.ndarray] = None) -> FlowState:
+        """
+        轻量界面识别：提示区域出现购买结论为购买结果，名称区域有文字为商品页，否则视为交易行
+
+        只用已有的两个区域，画面未变或为空白时由前置过滤直接返回，通常不需要OCR。
+        """
+        if self._read_purchase_verdict(baseline) is not None:
+            return FlowState.RESULT
+        if self._get_product_name('name'):
+            return FlowState.PRODUCT
+        return FlowState.HALL
+
+    def _recover(self, screen: FlowState):
+        """从意外界面按最短路径回到交易行，每轮操作后重新识别界面"""
+        for _ in range(MAX_RECOVERY_STEPS):
+            actions = RECOVERY_ACTIONS[screen]
+            if not actions:
+                return
+            self.flow_stats.recovery(screen)
+            self.logger.info("当前界面: %s，返回交易行", screen.value)
+            for action in actions:
+                if action == 'close':
+                    self._cancel_operation()
+                else:
+                    self._switch_to_trading()
+            screen = self._await_hall()
+        self.logger.warning("未能回到交易行 (当前界面: %s)", screen.value)
+
+    def _await_hall(self) -> FlowState:
+        """等待商品页关闭，超过 hall 超时返回当前界面"""
+        deadline = time.perf_counter() + self._runtime_config['state_timeouts']['hall']
+        while True:
+            # 只看名称区域：购买提示可能在回到交易行后还停留片刻，不能因此再按 ESC
+            screen = FlowState.PRODUCT if self._get_product_name('name') else FlowState.HALL
+            if screen is FlowState.HALL:
+                return screen
+            if time.perf_counter() >= deadline:
+                self.flow_stats.timeout(FlowState.HALL)
+                return screen
+            self._wait(min(PURCHASE_POLL_INTERVAL, max(deadline - time.perf_counter(), 0)))
+
+    def _open_product_page(self, plan: CardPlan):
+        """点击商品打开商品页（不等待）"""
+        x, y = plan.click_point
+        self._perform_click(x, y)
+        self._page_open = True
+
+    def _get_price_information(self, plan: CardPlan) -> Dict:
+        """获取价格信息，置信度不足时重新截图，仍不足时 valid 为 False 并带 low_confidence 标记"""
+        return self._read_confident_number(self._layout.price_region, ('price', plan.index))
+
+    def _read_confident_number(self, region, key) -> Dict:
+        """识别数字区域（价格、数量、总价），置信度不足时重新截图，仍不足视为无效"""
+        def read():
+            info = self._ocr_process_price(self._capture(region, PRICE_THRESHOLD), key)
+            return info, info.get('confidence')
+
+        info, confident = self._read_confident(key[0], read)
+        if not confident:
+            return {**info, 'valid': False, 'low_confidence': True}
+        return info
+
+    def _read_confident(self, kind: str, read: Callable[[], Tuple[Any, Optional[float]]]) -> Tuple[Any, bool]:
+        """
+        置信度把关：read() 截图并识别一次，返回 (结果, 置信度)，置信度为 None 表示没有可把关的文字
+
+        置信度低于该类区域的阈值时不离开当前页面，间隔几毫秒重新截图识别，最多重试 ocr_confidence_retries 次；
+        画面未变时前置过滤直接复用结果，重试几乎不占OCR时间。返回最后一次的结果及是否达标。
+        """
+        settings = self._runtime_config['ocr_confidence']
+        threshold = settings['thresholds'].get(kind, 0)
+        retries = 0
+        while True:
+            value, confidence = read()
+            if confidence is None or confidence >= threshold:
+                if confidence is not None:
+                    self.confidence_stats.accept(kind, retries)
+                return value, True
+            if retries >= settings['retries']:
+                self.confidence_stats.reject(kind, retries)
+                return value, False
+            retries += 1
+            self._wait(CONFIDENCE_RETRY_INTERVAL)
+
+    def _ocr_process_price(self, image, key) -> Dict:
+        """OCR处理价格信息"""
+        try:
+            # 稀疏的短数字与空白画面相近，数字区域不学习空白特征，避免把真实价格当作空白跳过
+            result = self._recognize_region(key, image, PRICE_THRESHOLD, 'en', cls=False, learn_empty=False)
+            if not result or not result[0]:
+                return {'valid': False}
+
+
+            raw_text, confidence = result[0][0][1]
+            clean_text = ''.join(filter(str.isdigit, raw_text))
+            if not clean_text:
+                return {'valid': False, 'raw_text': raw_text}
+
+            return {
+                'valid': True,
+                'numeric_value': int(clean_text),
+                'raw_text': raw_text,
+                'confidence': float(confidence)
+            }
+        except Exception as e:
+            self.logger.error("价格识别失败: %s", str(e))
+            return {'valid': False}
+
+    def _get_product_name(self, key) -> Optional[str]:
+        """识别名称区域的文字，没有文字时返回 None（key 为前置过滤的区域键）"""
+        return self._read_product_name(key)[0]
+
+    def _read_product_name(self, key) -> Tuple[Optional[str], Optional[float]]:
+        """识别名称区域的文字及其置信度，没有文字时返回 (None, None)"""
+        region = self._layout.name_region
+
+        if region is None:
+            self.logger.error("商品名称区域配置无效")
+            return None, None
+
+        try:
+            # 获取增强型截图
+            screenshot = self._capture(region, SCREENSHOT_THRESHOLD)
+
+            if not screenshot:
+                return None, None
+
+            # 使用中文OCR识别
+            result = self._recognize_region(key, screenshot, SCREENSHOT_THRESHOLD, 'ch', cls=True)
+            if not result or not result[0]:
+                return None, None
+
+            text, confidence = result[0][0][1]  # 第一个识别结果的文字和置信度
+            text = text.replace(" ", "").strip()
+
+            return (text, float(confidence)) if text else (None, None)
+        except Exception as e:
+            self.logger.error("商品名称识别失败: %s", str(e))
+            return None, None
+
+    def _handle_success_purchase(self, plan: CardPlan):
+        """处理成功购买（优化后的实现）"""
+        try:
+            card = self._runtime_config['products'][plan.index]
+            self.logger.info("成功处理购买: %s (累计%d次)",
+                        plan.name, card['already_buy_count'])
+
+        except Exception as e:
+            self.logger.error("购买处理异常: %s", str(e))
+
+    @staticmethod
+    def _is_acceptable_price(price_info: Dict, plan: CardPlan) -> bool:
+        """判断价格是否可接受"""
+        return price_info.get('numeric_value', 0) <= plan.price_ceiling
+
+    def _confirm_purchase_success(self, clicked_at: float, baseline: Optional[np.ndarray]) -> Optional[bool]:
+        """从点击购买起持续采样提示区域，首次得到成功/失败结论即返回，超过 buy_confirm_interval 返回 None"""
+        deadline = clicked_at + self._runtime_config['buy_confirm_interval']
+        verdict = None
+        while True:
+            verdict = self._read_purchase_verdict(baseline)
+            if verdict is not None or time.perf_counter() >= deadline:
+                break
+            self._wait(min(PURCHASE_POLL_INTERVAL, max(deadline - time.perf_counter(), 0)))
+
+        elapsed = time.perf_counter() - clicked_at
+        if verdict is None:
+            self.logger.warning("购买确认超时 (%.0fms)", elapsed * 1000)
+            self._dump_frames("购买确认超时", elapsed_ms=round(elapsed * 1000))
+            return None
+
+        self.confirm_latency.record(elapsed)
+        self.logger.info("购买确认耗时 %.0fms (%s)", elapsed * 1000, "成功" if verdict else "失败")
+        if not verdict:
+            self._dump_frames("购买失败", elapsed_ms=round(elapsed * 1000))
+        if self.confirm_latency.total % CONFIRM_SUMMARY_EVERY == 0:
+            self.logger.info("购买确认耗时分布: %s", self.confirm_latency.format_summary())
+        return verdict
+
+    def _capture_message(self) -> Optional[np.ndarray]:
+        """截取购买提示区域"""
+        screenshot = self._capture(self._layout.message_region, SCREENSHOT_THRESHOLD)
+        return np.array(screenshot) if screenshot else None
+
+    def _read_purchase_verdict(self, baseline: Optional[np.ndarray] = None) -> Optional[bool]:
+        """
+        识别一次购买提示：成功返回 True，失败返回 False，尚无结论返回 None
+
+        给出 baseline（点击购买前的画面）时，与之完全相同的画面视为尚无结论，避免把残留的旧提示当作本次结果。
+        """
+        screenshot = self._capture_message()
+
+        if screenshot is None or (baseline is not None and np.array_equal(screenshot, baseline)):
+            return None
+
+        try:
+            # 提示出现前的画面不加入空白特征，避免把较小的提示文字误判为空白
+            result = self._recognize_region('message', screenshot, SCREENSHOT_THRESHOLD, 'ch', cls=True,
+                                            learn_empty=False)
+            texts = [res[1][0] for res in result[0]] if result and result[0] else []
+        except Exception as e:
+            self.logger.error("购买确认失败: %s", str(e))
+            return None
+
+        if any(keyword in text for text in texts for keyword in PURCHASE_SUCCESS_KEYWORDS):
+            return True
+        if any(keyword in text for text in texts for keyword in PURCHASE_FAILURE_KEYWORDS):
+            return False
+        return None
+
+    def _record_transaction(self, plan: CardPlan, price_info: Dict):
+        """记录交易信息，一次购买多件时每件一条记录"""
+        quantity = price_info.get('quantity', 1)
+        for unit in range(1, quantity + 1):
+            log_entry = (
+                f"购买时间：{datetime.datetime.now():%Y-%m-%d %H:%M:%S} | "
+                f"物品名称: {plan.name} | "
+                f"理想价格: {plan.expect_price} | "
+                f"最高执行价格: {plan.price_ceiling} | "
+                f"购买价格: {price_info['numeric_value']} | "
+                f"溢价: {((price_info['numeric_value'] / plan.expect_price) - 1) * 100:.2f}%"
+                + (f" | 第 {unit}/{quantity} 件" if quantity > 1 else "") + "\n"
+            )
+
+            self.logger.info(log_entry.strip())
+            # self._write_log_file(log_entry)
+        self._update_card_counter(plan, quantity)
+
+    # @staticmethod
+    # def _write_log_file(content: str):
+    #     """写入日志文件"""
+    #     try:
+    #         with open("logs.txt", "a", encoding="utf-8") as f:
+    #             f.write(content)
+    #     except Exception as e:
+    #         self.logger.error("日志写入失败: %s", str(e))
+
+    def _update_card_counter(self, plan: CardPlan, quantity: int = 1):
+        """更新购买计数器"""
+        card = self._runtime_config['products'][plan.index]
+        card['already_buy_count'] = card.get('already_buy_count', 0) + quantity
+
+        self._write_buy_count(plan, card['already_buy_count'])
+        if self.on_bought:
+            self.on_bought(plan.index, card)
+        self.logger.info("配置更新成功: %s", plan.name)
+
+    def _write_buy_count(self, plan: CardPlan, count: int):
+        """只回写该商品的已购数量（多实例时写入对应实例），不覆盖运行期间对其它配置的修改"""
+
+        def _update_products(products):
+            candidates = [products[plan.index]] if plan.index < len(products) else []
+            candidates += products
+            for card in candidates:
+                if card.get('name') == plan.name:
+                    card['already_buy_count'] = count
+                    break
+            return products
+
+        if self.instance_index is None:
+            update_config_field("products", _update_products, [])
+            return
+
+        def _update(instances):
+            instance = instances[self.instance_index]
+            instance['products'] = _update_products(instance.get('products', []))
+            return instances
+
+        update_config_field("instances", _update, [])
+
+    def _cleanup_inactive_cards(self):
+        """清理已完成购买的商品（监控模式下不清理）"""
+        if self._monitoring():
+            return
+        products = self._runtime_config['products']
+        for plan in tuple(self._active_plans):
+            if products[plan.index].get('already_buy_count', 0) >= plan.buy_count:
+                self._active_plans.remove(plan)
+                self.logger.info("商品已完成购买: %s", plan.name)
+
+    def request_stop(self):
+        """发出停止信号，不等待工作线程退出"""
+        self._stop_event.set()
+
+    def stop(self):
+        """停止抢购流程"""
+        self.request_stop()
+
+        if self._worker_thread:
+            self._worker_thread.join(MAX_THREAD_JOIN_TIMEOUT)
+            if self._worker_thread.is_alive():
+                # 正在加载OCR模型或确认已点出的购买等不可中断的步骤，工作线程结束时会自行释放资源并通知停止，这里不阻塞调用方
+                self.logger.info("正在等待当前步骤（加载OCR模型或确认购买结果）结束")
+                return
+            self._worker_thread = None
+
+        self._release_resources()
+        self._notify_stopped()
+        self.logger.info("抢购流程已停止")
+
+    def wait_stopped(self, timeout: Optional[float] = None) -> bool:
+        """等待工作线程退出，返回是否已退出"""
+        thread = self._worker_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _release_resources(self):
+        """释放系统资源"""
+        with self._resource_lock:
+            if not self._ocr_acquired:
+                return
+            self._ocr_acquired = False
+        self._ocr.release()
+
+    def _ensure_foreground(self):
+        """多实例共享鼠标键盘，操作前确保绑定的窗口处于前台"""
+        if self._exclusive_window and not self._tracker.is_foreground():
+            self._tracker.activate()
+
+    def _capture(self, region, threshold):
+        """截取配置区域（按窗口当前位置换算为屏幕坐标）"""
+        return self._capture_source.grab(self._tracker.to_screen_region(region), threshold)
+
+    def _checkpoint(self):
+        """取消检查点：已请求停止时中断当前流程"""
+        if self._stop_event.is_set() and not self._cancel_deferred:
+            raise PurchaseCancelled()
+
+    def _wait(self, seconds: float):
+        """可被停止信号立即打断的等待"""
+        if self._cancel_deferred:
+            time.sleep(seconds)
+            return
+        if self._stop_event.wait(seconds):
+            raise PurchaseCancelled()
+
+    @contextmanager
+    def _defer_cancel(self):
+        """在此范围内检查点、等待和OCR都不响应停止信号，退出后由下一个检查点中断"""
+        self._cancel_deferred = True
+        try:
+            yield
+        finally:
+            self._cancel_deferred = False
+
+    def _recognize(self, lang: str, image, cls: bool):
+        """提交OCR请求并等待结果，等待期间响应停止信号"""
+        self._checkpoint()
+        future = self._ocr.submit(lang, image, cls)
+        while True:
+            try:
+                return future.result(timeout=OCR_POLL_INTERVAL)
+            except FutureTimeoutError:
+                if self._stop_event.is_set() and not self._cancel_deferred:
+                    future.cancel()
+                    raise PurchaseCancelled()
+
+    def _recognize_region(self, key, image, threshold: int, lang: str, cls: bool, learn_empty: bool = True):
+        """带前置过滤的区域识别：与该区域上次画面一致或为空白/加载画面时跳过OCR"""
+        array = np.array(image)
+        if not self._runtime_config['ocr_prefilter']:
+            result = self._recognize(lang, array, cls)
+        else:
+            skip, result, signature = self.prefilter.check(key, array, threshold)
+            if not skip:
+                result = self._recognize(lang, array, cls)
+                self.prefilter.store(key, signature, result, learn_empty)
+        if self.flight_recorder is not None:
+            self.flight_recorder.record(key if isinstance(key, str) else "_".join(map(str, key)), array, result)
+        return result
+
+    def _close_open_page(self):
+        """中断时关闭仍打开的商品页/购买弹窗，不留下半途的购买界面"""
+        if self._page_open:
+            with self._input_lock:
+                self._ensure_foreground()
+                self._input.press('esc')
+            self._page_open = False
+        self._page_identity = None
+        self.logger.info("抢购流程已中断")
+
+    def _perform_click(self, x: float, y: float, transition: Optional[str] = None, action: str = NAVIGATION):
+        """执行点击操作，先按 action 类别限速；指定 transition 时点击后按该类切换的间隔等待界面稳定"""
+        self._checkpoint()
+        self._limiter.acquire(action, self._wait)
+        with self._input_lock:
+            self._ensure_foreground()
+            x, y = self._tracker.to_screen_point((x, y))
+            if self._runtime_config['operation_mode']['is_debug']:
+                self._input.move(x, y)
+                return
+            self._input.click(x, y)
+        if transition:
+            self._settle(transition)
+
+    def _cancel_operation(self, next_point: Optional[Point] = None):
+        """取消当前操作，等待界面返回期间把光标预先移到 next_point"""
+        self._close_page()
+        self._premove(next_point)
+        self._settle('close')
+
+    def _premove(self, point: Optional[Point]):
+        """
+        光标预定位：识别或等待界面期间把光标预先移到下一个可能的点击目标，只移动、从不点击
+
+        最终的点击仍带坐标，光标被人为移开也不会点错位置。输入被其它实例占用或窗口不在前台时跳过，
+        调试模式下同样生效。
+        """
+        if point is None or not self._runtime_config['premove_cursor']:
+            return
+        if not self._input_lock.acquire(blocking=False):
+            return
+        try:
+            if self._exclusive_window and not self._tracker.is_foreground():
+                return
+            x, y = self._tracker.to_screen_point(point)
+            self._input.move(x, y)
+        finally:
+            self._input_lock.release()
+
+    def _close_page(self):
+        """按 ESC 关闭商品页（不等待）"""
+        self._checkpoint()
+        self._limiter.acquire(NAVIGATION, self._wait)
+        with self._input_lock:
+            self._ensure_foreground()
+            self._input.press('esc')
+        self._page_open = False
+        self._page_identity = None
+
+    def _settle(self, transition: str):
+        """按界面切换类型等待界面稳定"""
+        self._wait(self._runtime_config['transition_intervals'][transition])
+
+    def _notify_stopped(self):
+        """通知调用方流程已停止"""
+        if self.on_stopped:
+            self.on_stopped()
+
+    def _shutdown(self):
+        """执行关闭清理流程"""
+        if self.confirm_latency.total:
+            self.logger.info("购买确认耗时分布: %s", self.confirm_latency.format_summary())
+        prefilter_summary = self.prefilter.format_summary()
+        if prefilter_summary:
+            self.logger.info("OCR前置过滤: %s", prefilter_summary)
+        monitor_summary = self.monitor_stats.format_summary()
+        if monitor_summary:
+            self.logger.info("价格监控: %s", monitor_summary)
+        confidence_summary = self.confidence_stats.format_summary()
+        if confidence_summary:
+            self.logger.info("OCR置信度: %s", confidence_summary)
+        flow_summary = self.flow_stats.format_summary()
+        if flow_summary:
+            self.logger.info("购买状态机: %s", flow_summary)
+        limiter_summary = self._limiter.format_summary()
+        if limiter_summary:
+            self.logger.info("操作限流: %s", limiter_summary)
+        self._release_resources()
+        self._notify_stopped()
+        self.logger.info("系统资源已释放")
+
@@ -0,0 +1,185 @@
+import logging
+import threading
+import time
+import traceback
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from config import read_all_config
+from constants import PRICE_HISTORY_PATH
+from engine import PurchaseEngine
+from ocr_cache import OcrCache, CachedOcr, DEFAULT_CAPACITY
+from ocr_pool import OcrEnginePool
+from price_history import PriceHistoryStore
+
+CLOSE_WAIT_TIMEOUT = 10.0  # 退出时等待工作线程结束的最长时间
+
+
+class EngineGroup:
+    """
+    多实例抢购控制器（不依赖 PyQt）
+
+    为 config.json 中 instances 的每一项创建一个绑定独立游戏窗口的 PurchaseEngine，
+    所有实例共享同一个OCR引擎池和输入锁。未配置 instances 时退化为单实例。
+    传入 ocr_service（如独立进程的 OcrServerClient）时所有实例改用该服务。
+    识别到的价格统一记录到 price_history，供界面统计和图表使用。
+    OCR 结果经所有实例共享的 ocr_cache 缓存，ocr_cache_size 为 0 时不缓存。
+    on_progress 转发各实例的启动进度，所有实例都准备就绪后调用一次 on_ready，
+    on_alert 转发监控模式下各实例的价格提醒。
+    """
+
+    def __init__(self, logger: logging.Logger, ocr_service=None):
+        self.logger = logger
+        self.on_stopped: Optional[Callable[[], None]] = None
+        self.on_bought: Optional[Callable[[int, Dict], None]] = None
+        self.on_progress: Optional[Callable[[int, int, str], None]] = None
+        self.on_ready: Optional[Callable[[], None]] = None
+        self.on_alert: Optional[Callable[[int, str, int, int], None]] = None
+        self._input_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._ocr_pool = ocr_service
+        self._workers: List[PurchaseEngine] = []
+        self._stopped_workers = set()
+        self._ready_workers = set()
+        self._price_history: Optional[PriceHistoryStore] = None
+        self._history_lock = threading.Lock()
+        self._close_pending = False
+        self.ocr_cache: Optional[OcrCache] = None
+
+    @property
+    def price_history(self) -> Optional[PriceHistoryStore]:
+        """价格历史存储，首次访问时打开（热键线程和界面线程都会访问）；配置 record_price_history 为 false 时不记录"""
+        with self._history_lock:
+            if self._price_history is None:
+                config = read_all_config()
+                if config.get("record_price_history", True):
+                    self._price_history = PriceHistoryStore(
+                        config.get("price_history_path", PRICE_HISTORY_PATH), logger=self.logger)
+            return self._price_history
+
+    def _build_workers(self):
+        """根据当前配置创建抢购实例"""
+        config = read_all_config()
+        instances = config.get("instances", [])
+        pool_size = config.get("ocr_pool_size", 1)
+        shared = config.get("ocr_shared_engine", False)
+
+        if self._ocr_pool is None or isinstance(self._ocr_pool, OcrEnginePool) \
+                and (self._ocr_pool.size, self._ocr_pool.shared) != (pool_size, shared):
+            self._ocr_pool = OcrEnginePool(size=pool_size, logger=self.logger, shared=shared)
+
+        ocr = self._ocr_pool
+        cache_size = config.get("ocr_cache_size", DEFAULT_CAPACITY)
+        if cache_size > 0:
+            if self.ocr_cache is None:
+                self.ocr_cache = OcrCache(cache_size, config.get("ocr_cache_path"), self.logger)
+            self.ocr_cache.capacity = cache_size
+            ocr = CachedOcr(self._ocr_pool, self.ocr_cache)
+
+        indexes = list(range(len(instances))) if instances else [None]
+        self._workers = [
+            PurchaseEngine(self.logger, ocr_pool=ocr,
+                           instance_index=index, input_lock=self._input_lock,
+                           price_history=self.price_history)
+            for index in indexes
+        ]
+        for worker in self._workers:
+            worker.on_stopped = partial(self._on_worker_stopped, worker)
+            worker.on_bought = self._on_worker_bought
+            worker.on_progress = partial(self._on_worker_progress, worker)
+            worker.on_ready = partial(self._on_worker_ready, worker)
+            worker.on_alert = self._on_worker_alert
+
+    def is_running(self) -> bool:
+        """是否有实例在运行"""
+        return any(worker.is_running() for worker in self._workers)
+
+    def start(self):
+        """启动所有实例"""
+        if self.is_running():
+            self.logger.warning("操作线程已在运行中")
+            return
+
+        try:
+            with self._state_lock:
+                self._build_workers()
+                self._stopped_workers = set()
+                self._ready_workers = set()
+                self._close_pending = False
+        except Exception as e:
+            # 在调用方（界面线程）中执行：配置损坏或历史文件不可写时记录错误并通知已停止，恢复开始按钮
+            self.logger.error("启动失败: %s", str(e))
+            self.logger.error("详细错误信息: %s", traceback.format_exc())
+            if self.on_stopped:
+                self.on_stopped()
+            return
+        self.logger.info("启动 %d 个抢购实例", len(self._workers))
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self):
+        """停止所有实例：先同时发出停止信号，再逐个等待退出"""
+        for worker in self._workers:
+            worker.request_stop()
+        for worker in self._workers:
+            worker.stop()
+
+    def _on_worker_bought(self, index: int, card: Dict):
+        if self.on_bought:
+            self.on_bought(index, card)
+
+    def _on_worker_alert(self, index: int, name: str, price: int, ceiling: int):
+        if self.on_alert:
+            self.on_alert(index, name, price, ceiling)
+
+    def _on_worker_progress(self, worker: PurchaseEngine, step: int, total: int, phase: str):
+        if self.on_progress:
+            if worker.instance_index is not None:
+                phase = f"实例{worker.instance_index} {phase}"
+            self.on_progress(step, total, phase)
+
+    def _on_worker_ready(self, worker: PurchaseEngine):
+        """所有实例都准备就绪后通知一次"""
+        with self._state_lock:
+            self._ready_workers.add(worker)
+            all_ready = len(self._ready_workers) == len(self._workers)
+        if all_ready and self.on_ready:
+            self.on_ready()
+
+    def _on_worker_stopped(self, worker: PurchaseEngine):
+        """所有实例都停止后通知一次"""
+        with self._state_lock:
+            if worker in self._stopped_workers:
+                return
+            self._stopped_workers.add(worker)
+            all_stopped = len(self._stopped_workers) == len(self._workers)
+            close_history = all_stopped and self._close_pending
+        if close_history:
+            self._close_price_history()
+        if all_stopped and self.on_stopped:
+            self.on_stopped()
+
+    def close(self, timeout: float = CLOSE_WAIT_TIMEOUT):
+        """
+        停止所有实例并保存OCR缓存，等工作线程退出后关闭价格历史存储（写完剩余记录）
+
+        超时仍有实例未退出（如正在加载OCR模型）时不关闭存储，由最后一个停止的实例关闭，避免关闭后仍有写入。
+        """
+        self.stop()
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.wait_stopped(max(0.0, deadline - time.monotonic()))
+        if self.ocr_cache is not None:
+            self.ocr_cache.save()
+        with self._state_lock:
+            if len(self._stopped_workers) < len(self._workers):
+                self._close_pending = True
+                self.logger.warning("仍有实例未退出，价格历史将在其停止后关闭")
+                return
+        self._close_price_history()
+
+    def _close_price_history(self):
+        with self._history_lock:
+            store, self._price_history = self._price_history, None
+        if store is not None:
+            store.close()
@@ -0,0 +1,122 @@
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+
+DEFAULT_FRAMES = 32
+DEFAULT_SLOT_BYTES = 256 * 1024  # 单帧最大字节数，超出时只保留能放下的行
+MIN_DUMP_INTERVAL = 5.0  # 两次转储之间的最小间隔（秒），避免连续失败时刷屏写盘
+MAX_DUMPS = 100  # 每次运行最多转储的次数
+
+
+def _ocr_texts(result: Any) -> List:
+    """OCR 原始结果精简为 [文字, 置信度] 列表"""
+    if not result or not result[0]:
+        return []
+    return [[line[1][0], float(line[1][1])] for line in result[0]]
+
+
+class FlightRecorder:
+    """
+    截图飞行记录器
+
+    最近 frames 张截图保存在一块预先分配的 uint8 内存中循环覆盖，记录时只做一次内存拷贝，
+    不分配内存也不写盘。dump() 在出现失败时把当前所有帧连同OCR结果复制出来，
+    交给后台线程写成 PNG 和 frames.json。
+    """
+
+    def __init__(self, directory: str, frames: int = DEFAULT_FRAMES, slot_bytes: int = DEFAULT_SLOT_BYTES,
+                 logger=None):
+        self.directory = directory
+        self.logger = logger
+        self._block = np.zeros((max(1, frames), slot_bytes), dtype=np.uint8)
+        self._shapes = np.zeros((max(1, frames), 2), dtype=np.int32)
+        self._times = np.zeros(max(1, frames), dtype=np.float64)
+        self._labels: List[Optional[str]] = [None] * max(1, frames)
+        self._results: List[Any] = [None] * max(1, frames)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._last_dump = 0.0
+        self._dumps = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+
+    @property
+    def capacity(self) -> int:
+        """可保存的帧数"""
+        return len(self._labels)
+
+    def record(self, label: str, image: np.ndarray, result: Any = None):
+        """记录一帧灰度截图及其OCR结果（结果只保存引用）"""
+        if image.ndim != 2 or image.dtype != np.uint8:
+            return
+        width = image.shape[1]
+        rows = min(image.shape[0], self._block.shape[1] // max(width, 1))
+        with self._lock:
+            slot = self._count % len(self._labels)
+            self._block[slot, :rows * width].reshape(rows, width)[:] = image[:rows]
+            self._shapes[slot] = (rows, width)
+            self._times[slot] = time.time()
+            self._labels[slot] = label
+            self._results[slot] = result
+            self._count += 1
+
+    def dump(self, reason: str, details: Any = None) -> bool:
+        """异步转储当前所有帧，受最小间隔和次数上限限制，返回是否已提交"""
+        now = time.monotonic()
+        with self._lock:
+            if not self._count or self._dumps >= MAX_DUMPS or now - self._last_dump < MIN_DUMP_INTERVAL:
+                return False
+            self._last_dump = now
+            self._dumps += 1
+            size = len(self._labels)
+            order = [(self._count + i) % size for i in range(size)] if self._count >= size else range(self._count)
+            frames = []
+            for slot in order:
+                rows, width = self._shapes[slot]
+                frames.append((self._labels[slot], float(self._times[slot]),
+                               self._block[slot, :rows * width].reshape(rows, width).copy(),
+                               self._results[slot]))
+        self._ensure_writer()
+        self._queue.put((reason, details, frames))
+        return True
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="flight-recorder", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            reason, details, frames = self._queue.get()
+            try:
+                self._write(reason, details, frames)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("截图转储失败: %s", str(e))
+
+    def _write(self, reason: str, details: Any, frames: List):
+        from PIL import Image
+
+        folder = os.path.join(self.directory, f"{datetime.datetime.now():%Y%m%d_%H%M%S_%f}")
+        os.makedirs(folder, exist_ok=True)
+        entries = []
+        for seq, (label, captured_at, pixels, result) in enumerate(frames):
+            file_name = f"{seq:03d}_{label}.png"
+            Image.fromarray(pixels).save(os.path.join(folder, file_name))
+            entries.append({
+                'file': file_name,
+                'label': label,
+                'time': datetime.datetime.fromtimestamp(captured_at).isoformat(timespec="milliseconds"),
+                'ocr': _ocr_texts(result),
+            })
+        with open(os.path.join(folder, "frames.json"), "w", encoding="utf-8") as f:
+            json.dump({'reason': reason, 'details': details, 'frames': entries}, f,
+                      ensure_ascii=False, indent=2, default=str)
+        if self.logger:
+            self.logger.info("已转储 %d 帧截图: %s", len(frames), folder)
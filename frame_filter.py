@@ -0,0 +1,96 @@
+import hashlib
+import threading
+from collections import deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+HASH_SIZE = 8  # dHash 为 8x8 位
+HISTOGRAM_BINS = 16
+UNIFORM_RATIO = 0.001  # 二值化后前景或背景像素占比低于该值视为空白区域
+EMPTY_HASH_DISTANCE = 2  # 与已知空白/加载画面的 dHash 汉明距离上限
+EMPTY_HISTOGRAM_DISTANCE = 0.005  # 与已知空白/加载画面的直方图 L1 距离上限，约 0.25% 像素变化
+EMPTY_SIGNATURE_LIMIT = 64  # 每个区域最多保存的空白/加载画面特征数
+
+EMPTY_RESULT = [None]  # 与 PaddleOCR 未识别到文字时的返回值一致
+
+
+class FrameSignature:
+    """区域截图的特征：二值化摘要、dHash 和灰度直方图"""
+
+    __slots__ = ('shape', 'digest', 'dhash', 'histogram', 'uniform')
+
+    def __init__(self, image: np.ndarray, threshold: int):
+        binary = image > threshold
+        self.shape = image.shape
+        self.digest = hashlib.blake2b(np.packbits(binary).tobytes() + bytes(str(image.shape), "ascii"),
+                                      digest_size=16).digest()
+        foreground = np.count_nonzero(binary) / max(binary.size, 1)
+        self.uniform = min(foreground, 1 - foreground) < UNIFORM_RATIO
+        self.dhash = self._dhash(image)
+        histogram, _ = np.histogram(image, bins=HISTOGRAM_BINS, range=(0, 256))
+        self.histogram = histogram / max(image.size, 1)
+
+    @staticmethod
+    def _dhash(image: np.ndarray) -> int:
+        """缩小为 9x8 后比较相邻像素得到 64 位差异哈希"""
+        rows = np.linspace(0, image.shape[0] - 1, HASH_SIZE).astype(int)
+        cols = np.linspace(0, image.shape[1] - 1, HASH_SIZE + 1).astype(int)
+        thumbnail = image[np.ix_(rows, cols)].astype(np.int16)
+        bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).ravel()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def resembles(self, other: 'FrameSignature') -> bool:
+        """感知上是否相似（只用于识别空白/加载画面，不用于复用价格）"""
+        return self.shape == other.shape \
+            and bin(self.dhash ^ other.dhash).count("1") <= EMPTY_HASH_DISTANCE \
+            and float(np.abs(self.histogram - other.histogram).sum()) <= EMPTY_HISTOGRAM_DISTANCE
+
+
+class FramePrefilter:
+    """
+    OCR 前置过滤
+
+    每个区域（按调用方给出的 key 区分，如某商品的名称区域）记住上一次的截图特征和识别结果：
+    二值化后与上次完全一致时直接复用上次结果；区域为空白，或与该区域曾经识别不出文字的画面
+    （空列表、加载中等）感知相似时直接返回空结果。空白特征按区域分别保存，一个区域学到的画面
+    不会用于其它区域。感知哈希不足以区分相近的数字，因此复用识别结果只依据二值化摘要。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last: Dict[Hashable, Tuple[bytes, Any]] = {}
+        self._empty_signatures: Dict[Hashable, deque] = {}
+        self.counters = {'unchanged': 0, 'empty': 0, 'ocr': 0}
+
+    def check(self, key: Hashable, image: np.ndarray, threshold: int) -> Tuple[bool, Any, FrameSignature]:
+        """返回 (是否可跳过OCR, 可复用的结果, 截图特征)"""
+        signature = FrameSignature(image, threshold)
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and last[0] == signature.digest:
+                self.counters['unchanged'] += 1
+                return True, last[1], signature
+            if signature.uniform or any(signature.resembles(empty) for empty in self._empty_signatures.get(key, ())):
+                self.counters['empty'] += 1
+                return True, EMPTY_RESULT, signature
+            self.counters['ocr'] += 1
+        return False, None, signature
+
+    def store(self, key: Hashable, signature: FrameSignature, result: Any, learn_empty: bool = True):
+        """记录本次OCR结果，learn_empty 为 True 时识别不出文字的画面加入空白特征"""
+        with self._lock:
+            self._last[key] = (signature.digest, result)
+            if learn_empty and (not result or not result[0]):
+                self._empty_signatures.setdefault(key, deque(maxlen=EMPTY_SIGNATURE_LIMIT)).append(signature)
+
+    def format_summary(self) -> Optional[str]:
+        """跳过比例摘要"""
+        with self._lock:
+            counters = dict(self.counters)
+        total = sum(counters.values())
+        if not total:
+            return None
+        skipped = counters['unchanged'] + counters['empty']
+        return (f"共 {total} 次 | 跳过 {skipped} 次 ({skipped / total:.0%}) | "
+                f"画面未变 {counters['unchanged']} | 空白 {counters['empty']} | OCR {counters['ocr']}")
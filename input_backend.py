@@ -0,0 +1,218 @@
+import abc
+import ctypes
+import sys
+import time
+from typing import List, Optional, Tuple
+
+# SendInput 常量
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_VIRTUALDESK = 0x4000
+MOUSEEVENTF_ABSOLUTE = 0x8000
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_SCANCODE = 0x0008
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+MAPVK_VK_TO_VSC = 0
+
+# 支持的命名按键及其虚拟键码；扩展键（方向键、Home 等）发送扫描码时需要额外标志，不在此列
+VIRTUAL_KEYS = {
+    'esc': 0x1B,
+    'enter': 0x0D,
+    'tab': 0x09,
+    'space': 0x20,
+    'backspace': 0x08,
+    **{f'f{number}': 0x70 + number - 1 for number in range(1, 13)},
+}
+
+
+def virtual_key(key: str) -> Optional[int]:
+    """按键名称对应的虚拟键码：命名按键查表，单个字母或数字的键码即其大写 ASCII 码，不支持时返回 None"""
+    if key in VIRTUAL_KEYS:
+        return VIRTUAL_KEYS[key]
+    if len(key) == 1 and key.isascii() and key.isalnum():
+        return ord(key.upper())
+    return None
+
+
+def is_supported_key(key: str) -> bool:
+    """所有输入后端都能发送的按键"""
+    return isinstance(key, str) and virtual_key(key.lower()) is not None
+
+
+class InputBackend(abc.ABC):
+    """鼠标键盘输入后端接口，所有延时均由调用方显式控制"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def move(self, x: float, y: float):
+        """移动鼠标到指定坐标"""
+
+    @abc.abstractmethod
+    def click(self, x: float, y: float):
+        """移动到指定坐标并单击左键"""
+
+    @abc.abstractmethod
+    def press(self, key: str):
+        """按下并释放一个按键"""
+
+
+if sys.platform == "win32":
+    class _MouseInput(ctypes.Structure):
+        _fields_ = [("dx", ctypes.c_long),
+                    ("dy", ctypes.c_long),
+                    ("mouseData", ctypes.c_ulong),
+                    ("dwFlags", ctypes.c_ulong),
+                    ("time", ctypes.c_ulong),
+                    ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong))]
+
+    class _KeyboardInput(ctypes.Structure):
+        _fields_ = [("wVk", ctypes.c_ushort),
+                    ("wScan", ctypes.c_ushort),
+                    ("dwFlags", ctypes.c_ulong),
+                    ("time", ctypes.c_ulong),
+                    ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong))]
+
+    class _InputUnion(ctypes.Union):
+        _fields_ = [("mi", _MouseInput), ("ki", _KeyboardInput)]
+
+    class _Input(ctypes.Structure):
+        _fields_ = [("type", ctypes.c_ulong), ("u", _InputUnion)]
+
+
+class DirectInputBackend(InputBackend):
+    """基于 Win32 SendInput 的低延迟后端，移动和点击在一次调用中提交"""
+
+    name = "direct"
+
+    def __init__(self, click_hold_interval: float = 0.0):
+        if sys.platform != "win32":
+            raise OSError("SendInput 仅支持 Windows")
+        self.click_hold_interval = click_hold_interval
+        self._user32 = ctypes.windll.user32
+        self._origin_x = self._user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
+        self._origin_y = self._user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
+        self._width = max(self._user32.GetSystemMetrics(SM_CXVIRTUALSCREEN) - 1, 1)
+        self._height = max(self._user32.GetSystemMetrics(SM_CYVIRTUALSCREEN) - 1, 1)
+        self._scan_codes = {}
+
+    def _absolute(self, x: float, y: float) -> Tuple[int, int]:
+        """屏幕坐标转换为 SendInput 的 0~65535 归一化坐标"""
+        return (round((x - self._origin_x) * 65535 / self._width),
+                round((y - self._origin_y) * 65535 / self._height))
+
+    def _mouse(self, x: float, y: float, flags: int) -> '_Input':
+        dx, dy = self._absolute(x, y)
+        return _Input(type=INPUT_MOUSE, u=_InputUnion(mi=_MouseInput(
+            dx, dy, 0, flags | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK, 0, None)))
+
+    @staticmethod
+    def _key(scan_code: int, flags: int) -> '_Input':
+        return _Input(type=INPUT_KEYBOARD, u=_InputUnion(ki=_KeyboardInput(
+            0, scan_code, flags | KEYEVENTF_SCANCODE, 0, None)))
+
+    def _send(self, *events):
+        array = (_Input * len(events))(*events)
+        sent = self._user32.SendInput(len(events), array, ctypes.sizeof(_Input))
+        if sent != len(events):
+            raise OSError(f"SendInput 仅提交了 {sent}/{len(events)} 个事件")
+
+    def move(self, x: float, y: float):
+        self._send(self._mouse(x, y, MOUSEEVENTF_MOVE))
+
+    def click(self, x: float, y: float):
+        down = self._mouse(x, y, MOUSEEVENTF_MOVE | MOUSEEVENTF_LEFTDOWN)
+        up = self._mouse(x, y, MOUSEEVENTF_LEFTUP)
+        if self.click_hold_interval > 0:
+            self._send(down)
+            time.sleep(self.click_hold_interval)
+            self._send(up)
+        else:
+            self._send(down, up)
+
+    def _scan_code(self, key: str) -> int:
+        """按当前键盘布局把虚拟键码换算为扫描码（游戏通常只认扫描码），结果缓存"""
+        scan_code = self._scan_codes.get(key)
+        if scan_code is None:
+            vk = virtual_key(key.lower())
+            scan_code = self._user32.MapVirtualKeyW(vk, MAPVK_VK_TO_VSC) if vk is not None else 0
+            if not scan_code:
+                raise ValueError(f"不支持的按键: {key}")
+            self._scan_codes[key] = scan_code
+        return scan_code
+
+    def press(self, key: str):
+        scan_code = self._scan_code(key)
+        self._send(self._key(scan_code, 0), self._key(scan_code, KEYEVENTF_KEYUP))
+
+
+class PyAutoGuiBackend(InputBackend):
+    """pyautogui 后备实现，关闭其内置的全局 PAUSE"""
+
+    name = "pyautogui"
+
+    def __init__(self, click_hold_interval: float = 0.0):
+        # 延迟导入，无图形环境（如模拟器测试）时不加载 pyautogui
+        import pyautogui
+
+        self._pyautogui = pyautogui
+        self.click_hold_interval = click_hold_interval
+
+    def move(self, x: float, y: float):
+        self._pyautogui.moveTo(x, y, _pause=False)
+
+    def click(self, x: float, y: float):
+        if self.click_hold_interval > 0:
+            self._pyautogui.mouseDown(x, y, _pause=False)
+            time.sleep(self.click_hold_interval)
+            self._pyautogui.mouseUp(x, y, _pause=False)
+        else:
+            self._pyautogui.click(x, y, _pause=False)
+
+    def press(self, key: str):
+        self._pyautogui.press(key, _pause=False)
+
+
+class RecordingBackend(InputBackend):
+    """只记录事件不产生真实输入的后端，用于测试"""
+
+    name = "recording"
+
+    def __init__(self):
+        self.events: List[Tuple[float, str, tuple]] = []
+
+    def move(self, x: float, y: float):
+        self.events.append((time.perf_counter(), 'move', (x, y)))
+
+    def click(self, x: float, y: float):
+        self.events.append((time.perf_counter(), 'click', (x, y)))
+
+    def press(self, key: str):
+        self.events.append((time.perf_counter(), 'press', (key,)))
+
+    def clear(self):
+        """清空已记录的事件"""
+        self.events.clear()
+
+
+INPUT_BACKENDS = {
+    DirectInputBackend.name: DirectInputBackend,
+    PyAutoGuiBackend.name: PyAutoGuiBackend,
+}
+
+
+def create_input_backend(name: str, click_hold_interval: float = 0.0) -> InputBackend:
+    """按名称创建输入后端，直接后端不可用时回退到 pyautogui"""
+    backend_cls = INPUT_BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"未知的输入后端: {name}")
+    try:
+        return backend_cls(click_hold_interval)
+    except OSError:
+        return PyAutoGuiBackend(click_hold_interval)
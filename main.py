@@ -1,20 +1,25 @@
 import logging
+import multiprocessing
 import sys
 
 import keyboard
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox
+from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox, QSystemTrayIcon
 
 from basic_config import BasicConfig
 from config import read_all_config
 from constants import ICON_PATH
 from logger import configure_log_system, LogDisplayController
+from ocr_server import OcrServerClient, DEFAULT_SLOT_COUNT
+from price_history_view import PriceHistoryView
 from product_item import Products
 from rush import Rush
 from ui import Ui_MainWindow
 
+ALERT_MESSAGE_MS = 10000  # 价格提醒通知的显示时间
+
 class Main(Ui_MainWindow):
     def __init__(self, window=QMainWindow):
         super().__init__()
@@ -22,6 +27,7 @@ class Main(Ui_MainWindow):
         self.basic_config = None
         self.product_widget = None
         self.config = None
+        self.ocr_service = None
         self.read_config()
 
     def setup(self):
@@ -29,15 +35,93 @@ class Main(Ui_MainWindow):
         self.set_basic_config()
         self.set_logger()
         self.logger = logging.getLogger("app")
-        self.rush = Rush(self)
-        keyboard.add_hotkey("ctrl+1", lambda: self.rush.start())
+        self.start_ocr_service()
+        self.rush = Rush(self, self.ocr_service)
+        self.set_price_history_view()
+        self.set_ocr_cache_status()
+        self.set_run_status()
+        self.set_price_alert()
+        keyboard.add_hotkey("ctrl+1", lambda: self.rush.start_requested.emit())
         keyboard.add_hotkey("ctrl+2", lambda: self.rush.stop())
         self.__connect_signal_to_slot__()
 
+    def start_ocr_service(self):
+        # 按配置在独立进程中启动OCR服务，模型在后台加载
+        if not self.config.get("ocr_server", False):
+            return
+        self.ocr_service = OcrServerClient(
+            size=self.config.get("ocr_pool_size", 1),
+            slot_count=self.config.get("ocr_server_slots", DEFAULT_SLOT_COUNT),
+            logger=self.logger,
+            shared=self.config.get("ocr_shared_engine", False)
+        )
+        self.ocr_service.start()
+
+    def shutdown(self):
+        # 退出前保存商品修改、停止抢购、保存价格历史并关闭OCR服务进程
+        self.product_widget.model.flush()
+        self.rush.close()
+        if self.ocr_service:
+            self.ocr_service.close()
+
     def set_product_list(self):
-        self.product_widget = Products(self.product_config_scroll_area_layout, self, self.window)
-        self.product_config_scroll_area_widget.adjustSize()
-        self.product_config_scroll_area.updateGeometry()
+        self.product_widget = Products(self, self.window)
+
+    def set_price_history_view(self):
+        # 价格统计页，ui.py 由设计器生成，这里用代码插入到基础配置之前
+        self.price_history_view = PriceHistoryView(lambda: self.rush.engine.price_history)
+        self.main_tab_widget.insertTab(self.main_tab_widget.indexOf(self.tab_3), self.price_history_view, "价格统计")
+
+    def set_run_status(self):
+        # 启动进度和运行状态，显示在主控页的操作区
+        self.run_status_label = QtWidgets.QLabel("未启动")
+        self.verticalLayout_11.addWidget(self.run_status_label)
+
+    def set_price_alert(self):
+        # 监控模式的价格提醒通过系统托盘通知，托盘不可用时只在主控页显示
+        self.tray_icon = None
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray_icon = QSystemTrayIcon(QIcon(ICON_PATH), self.window)
+            self.tray_icon.show()
+
+    def on_rush_alert(self, index, name, price, ceiling):
+        message = f"{name} 当前价格 {price}，不高于上限 {ceiling}"
+        self.run_status_label.setText(f"价格提醒：{message}")
+        QApplication.alert(self.window)
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage("价格提醒", message, QSystemTrayIcon.Information, ALERT_MESSAGE_MS)
+
+    def on_rush_starting(self):
+        # 启动过程中禁用开始按钮，直到流程停止
+        self.start_btn.setEnabled(False)
+        self.run_status_label.setText("正在启动，按 Ctrl+2 取消")
+
+    def on_rush_progress(self, step, total, phase):
+        self.run_status_label.setText(f"正在启动 ({step}/{total})：{phase}，按 Ctrl+2 取消")
+
+    def on_rush_ready(self):
+        self.run_status_label.setText("运行中，按 Ctrl+2 停止")
+
+    def on_rush_stopped(self):
+        self.start_btn.setEnabled(True)
+        self.run_status_label.setText("已停止")
+
+    def set_ocr_cache_status(self):
+        # OCR缓存命中统计，显示在主控页的操作区
+        self.ocr_cache_label = QtWidgets.QLabel("OCR缓存：尚未启动")
+        self.verticalLayout_11.addWidget(self.ocr_cache_label)
+        self.ocr_cache_timer = QTimer()
+        self.ocr_cache_timer.timeout.connect(self.update_ocr_cache_status)
+        self.ocr_cache_timer.start(1000)
+
+    def update_ocr_cache_status(self):
+        cache = self.rush.engine.ocr_cache
+        if cache is None:
+            return
+        stats = cache.stats()
+        self.ocr_cache_label.setText(
+            f"OCR缓存：命中 {stats['hits']} / 未命中 {stats['misses']}"
+            f"（命中率 {stats['hit_rate']:.0%}，{stats['size']} 条）")
 
     def set_logger(self):
         # 设置日志窗口
@@ -47,12 +131,6 @@ class Main(Ui_MainWindow):
             QMessageBox.critical(self, "错误", f"日志初始化失败: {str(e)}")
             self.close()
 
-    def product_config_scroll_area_scroll_to_bottom(self):
-        # 确保使用正确的滚动区域控件
-        scroll_area = self.product_config_scroll_area
-        scroll_bar = scroll_area.verticalScrollBar()
-        QTimer.singleShot(300, lambda: scroll_bar.setValue(scroll_bar.maximum()))
-        
     def set_basic_config(self):
         # 设置基本配置
         self.basic_config = BasicConfig(self, self.config)
@@ -66,16 +144,28 @@ class Main(Ui_MainWindow):
         if current_tab_index != 1:
             self.main_tab_widget.setCurrentIndex(1)
         self.product_widget.add_product()
-        self.product_config_scroll_area_scroll_to_bottom()
+
+    def start_rush(self):
+        # 先保存尚未写盘的商品修改再启动
+        self.product_widget.model.flush()
+        self.rush.start()
 
     def __connect_signal_to_slot__(self):
         # 连接信号和槽
         self.add_product_menu.aboutToShow.connect(lambda: self.add_product())
-        self.start_btn.clicked.connect(lambda: self.rush.start())
+        self.start_btn.clicked.connect(self.start_rush)
+        self.rush.start_requested.connect(self.start_rush)
         self.stop_btn.clicked.connect(lambda: self.rush.stop())
+        self.rush.bought.connect(self.product_widget.update_buy_count)
+        self.rush.starting.connect(self.on_rush_starting)
+        self.rush.progress.connect(self.on_rush_progress)
+        self.rush.ready.connect(self.on_rush_ready)
+        self.rush.stopped.connect(self.on_rush_stopped)
+        self.rush.alert.connect(self.on_rush_alert)
 
 # 按装订区域中的绿色按钮以运行脚本。
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     configure_log_system()
     MainWindow = QtWidgets.QMainWindow()
@@ -84,6 +174,7 @@ if __name__ == '__main__':
     ui = Main(MainWindow)
     ui.setupUi(MainWindow)
     ui.setup()
+    app.aboutToQuit.connect(ui.shutdown)
     MainWindow.show()
     sys.exit(app.exec_())
 
@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+DEFAULT_CYCLE_INTERVAL = 0.0  # 每轮查看完所有商品后的暂停时间（秒）
+DEFAULT_ALERT_COOLDOWN = 60.0  # 同一商品两次提醒的最小间隔（秒），价格继续下跌时不受限制
+
+
+class PriceAlerts:
+    """价格提醒去重：同一商品在冷却时间内只提醒一次，除非价格比上次提醒时更低"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._last: Dict[str, Tuple[float, int]] = {}  # 商品名称 -> (上次提醒时间, 上次提醒价格)
+
+    def should_alert(self, name: str, price: int, cooldown: float) -> bool:
+        now = self._clock()
+        last = self._last.get(name)
+        if last is not None and now - last[0] < cooldown and price >= last[1]:
+            return False
+        self._last[name] = (now, price)
+        return True
+
+
+class MonitorStats:
+    """监控模式计数：查看次数、完整轮次及耗时、提醒次数"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started_at: Optional[float] = None
+        self.checks = 0
+        self.cycles = 0
+        self.cycle_time = 0.0
+        self.alerts = 0
+
+    def checked(self):
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = self._clock()
+            self.checks += 1
+
+    def cycle(self, seconds: float):
+        with self._lock:
+            self.cycles += 1
+            self.cycle_time += seconds
+
+    def alerted(self):
+        with self._lock:
+            self.alerts += 1
+
+    def format_summary(self) -> Optional[str]:
+        with self._lock:
+            if not self.checks:
+                return None
+            elapsed = self._clock() - self.started_at
+            parts = [f"查看价格 {self.checks} 次", f"每分钟 {self.checks / elapsed * 60:.0f} 次" if elapsed else None,
+                     f"完整轮次 {self.cycles} 次 (平均 {self.cycle_time / self.cycles * 1000:.0f}ms)"
+                     if self.cycles else None, f"提醒 {self.alerts} 次"]
+        return " | ".join(part for part in parts if part)
@@ -0,0 +1,44 @@
+import threading
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+
+class LatencyRecorder:
+    """保存最近 maxlen 次耗时，用于查看分布"""
+
+    def __init__(self, maxlen: int = 500):
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(self, seconds: float):
+        """记录一次耗时（秒）"""
+        with self._lock:
+            self._samples.append(seconds)
+            self.total += 1
+
+    def summary(self) -> Dict[str, float]:
+        """最近样本的统计信息，时间单位为毫秒"""
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=np.float64)
+        if samples.size == 0:
+            return {'count': 0}
+        p50, p90, p99 = np.percentile(samples, (50, 90, 99)) * 1000
+        return {
+            'count': int(samples.size),
+            'mean': float(samples.mean() * 1000),
+            'p50': float(p50),
+            'p90': float(p90),
+            'p99': float(p99),
+            'max': float(samples.max() * 1000),
+        }
+
+    def format_summary(self) -> str:
+        """格式化的统计信息，用于日志"""
+        stats = self.summary()
+        if not stats['count']:
+            return "暂无数据"
+        return ("样本 {count} | 平均 {mean:.0f}ms | p50 {p50:.0f}ms | "
+                "p90 {p90:.0f}ms | p99 {p99:.0f}ms | 最大 {max:.0f}ms").format(**stats)
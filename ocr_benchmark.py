@@ -0,0 +1,204 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from metrics import LatencyRecorder
+
+DEFAULT_ROUNDS = 20
+DEFAULT_TIMEOUT = 600.0  # 单种配置（含首次下载/加载模型）的最长测量时间（秒）
+RESULT_POLL_INTERVAL = 1.0  # 等待测量结果时检查子进程是否存活的间隔
+DEFAULT_FONT = "C:/Windows/Fonts/msyh.ttc"
+SAMPLE_NAMES = ("东楼经理室", "总裁会议室", "浮力设备室钥匙", "黑室服务器室")
+SAMPLE_PRICES = (43, 1250, 88000, 2450000, 12800000)
+# 按文件名前缀判断截图的识别语言，与引擎中的区域名称一致
+NUMERIC_PREFIXES = ("price", "quantity", "total")
+MODES = (("两个引擎", False), ("共用引擎", True))
+
+Sample = Tuple[str, Optional[str], np.ndarray]  # (语言, 期望文字, 灰度图)
+
+
+def _rss() -> Optional[int]:
+    """当前进程常驻内存（字节），未安装 psutil 时返回 None"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _text(result) -> str:
+    if not result or not result[0]:
+        return ""
+    return "".join(line[1][0] for line in result[0])
+
+
+def _matches(lang: str, expected: str, text: str) -> bool:
+    """价格只比较数字，名称忽略空格"""
+    if lang == 'en':
+        return ''.join(filter(str.isdigit, text)) == ''.join(filter(str.isdigit, expected))
+    return text.replace(" ", "") == expected
+
+
+def render_samples(names, prices, font_path: Optional[str] = None) -> List[Sample]:
+    """按游戏界面格式渲染名称与价格样本：名称走 'ch'，带千分位的价格走 'en'"""
+    font = ImageFont.truetype(font_path, 28) if font_path else ImageFont.load_default()
+    samples = [('ch', name, name) for name in names] + [('en', f"{price:,}", f"{price:,}") for price in prices]
+    rendered = []
+    for lang, expected, text in samples:
+        left, top, right, bottom = font.getbbox(text)
+        image = Image.new("L", (right - left + 24, bottom - top + 16), 0)
+        ImageDraw.Draw(image).text((12 - left, 8 - top), text, fill=255, font=font)
+        rendered.append((lang, expected, np.asarray(image)))
+    return rendered
+
+
+def load_samples(directory: str) -> List[Sample]:
+    """读取目录中的截图（如截图转储目录），按文件名前缀区分价格与名称，没有期望文字"""
+    samples = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.lower().endswith(".png"):
+            continue
+        label = file_name.split("_", 1)[-1] if file_name[:3].isdigit() else file_name
+        lang = 'en' if label.startswith(NUMERIC_PREFIXES) else 'ch'
+        image = Image.open(os.path.join(directory, file_name)).convert("L")
+        samples.append((lang, None, np.asarray(image)))
+    return samples
+
+
+def _measure(shared: bool, samples: List[Sample], rounds: int, results):
+    """在独立进程中加载一种配置并测量，避免两种配置的模型内存互相干扰"""
+    try:
+        _run_measure(shared, samples, rounds, results)
+    except Exception as e:
+        results.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _run_measure(shared: bool, samples: List[Sample], rounds: int, results):
+    from ocr_pool import OcrEnginePool
+
+    base_rss = _rss()
+    started = time.perf_counter()
+    pool = OcrEnginePool(size=1, shared=shared)
+    pool.acquire()
+    load_time = time.perf_counter() - started
+    loaded_rss = _rss()
+
+    correct = {'ch': 0, 'en': 0}
+    checked = {'ch': 0, 'en': 0}
+    for lang, expected, image in samples:  # 预热，同时统计准确率
+        text = _text(pool.ocr(lang, image, cls=lang == 'ch'))
+        if expected is not None:
+            checked[lang] += 1
+            correct[lang] += _matches(lang, expected, text)
+
+    latency = {'ch': LatencyRecorder(maxlen=rounds * len(samples)),
+               'en': LatencyRecorder(maxlen=rounds * len(samples))}
+    for _ in range(rounds):
+        for lang, _, image in samples:
+            started = time.perf_counter()
+            pool.ocr(lang, image, cls=lang == 'ch')
+            latency[lang].record(time.perf_counter() - started)
+    peak_rss = _rss()
+    pool.release()
+
+    results.put({
+        'load_seconds': load_time,
+        'model_mb': (loaded_rss - base_rss) / 2 ** 20 if base_rss is not None else None,
+        'peak_mb': peak_rss / 2 ** 20 if peak_rss is not None else None,
+        'latency': {lang: recorder.summary() for lang, recorder in latency.items()},
+        'accuracy': {lang: correct[lang] / checked[lang] for lang in checked if checked[lang]},
+    })
+
+
+def _collect(process, results, timeout: float) -> Dict:
+    """等待测量结果；子进程异常退出或超时时返回 {'error': 原因}，不会无限等待"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return results.get(timeout=RESULT_POLL_INTERVAL)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+            # 进程退出前放入的结果可能仍在管道中
+            try:
+                return results.get(timeout=RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                return {'error': f"测量进程异常退出 (exitcode={process.exitcode})"}
+    process.terminate()
+    return {'error': f"超过 {timeout:.0f} 秒未完成"}
+
+
+def run_benchmark(samples: List[Sample], rounds: int = DEFAULT_ROUNDS,
+                  timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Dict]:
+    """依次在新进程中测量两个引擎和共用引擎两种配置，失败的配置只包含 error"""
+    context = multiprocessing.get_context("spawn")
+    report = {}
+    for mode, shared in MODES:
+        results = context.Queue()
+        process = context.Process(target=_measure, args=(shared, samples, rounds, results), daemon=True)
+        process.start()
+        report[mode] = _collect(process, results, timeout)
+        process.join(RESULT_POLL_INTERVAL)
+    return report
+
+
+def format_report(report: Dict[str, Dict]) -> str:
+    """两种配置的对比表"""
+    def number(value, pattern):
+        return pattern.format(value) if value is not None else "-"
+
+    lines = [f"{'配置':<8}{'加载':>8}{'模型内存':>10}{'峰值内存':>10}"
+             f"{'名称p50/p90':>16}{'价格p50/p90':>16}{'名称准确率':>10}{'价格准确率':>10}"]
+    for mode, stats in report.items():
+        if 'error' in stats:
+            lines.append(f"{mode:<8}测量失败: {stats['error']}")
+            continue
+        latency = {lang: (f"{summary['p50']:.0f}/{summary['p90']:.0f}ms" if summary['count'] else "-")
+                   for lang, summary in stats['latency'].items()}
+        lines.append(f"{mode:<8}{stats['load_seconds']:>7.1f}s"
+                     f"{number(stats['model_mb'], '{:.0f}MB'):>10}{number(stats['peak_mb'], '{:.0f}MB'):>10}"
+                     f"{latency['ch']:>16}{latency['en']:>16}"
+                     f"{number(stats['accuracy'].get('ch'), '{:.0%}'):>10}"
+                     f"{number(stats['accuracy'].get('en'), '{:.0%}'):>10}")
+    measured = [stats for stats in report.values() if 'error' not in stats]
+    if measured and all(stats['model_mb'] is None for stats in measured):
+        lines.append("未安装 psutil，无法统计内存")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="对比中英文两个OCR引擎与共用一个引擎的内存、延迟和准确率")
+    parser.add_argument("--images", help="使用目录中的截图代替渲染样本，文件名以 price/quantity/total 开头的按价格识别")
+    parser.add_argument("--font", default=DEFAULT_FONT if os.path.exists(DEFAULT_FONT) else None,
+                        help="渲染样本使用的中文字体")
+    parser.add_argument("-n", "--rounds", type=int, default=DEFAULT_ROUNDS, help="每个样本的识别次数")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="每种配置的最长测量时间（秒）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    if args.images:
+        samples = load_samples(args.images)
+    else:
+        if not args.font:
+            print("未找到中文字体，名称样本无法正确渲染，请使用 --font 指定", file=sys.stderr)
+        samples = render_samples(SAMPLE_NAMES if args.font else (), SAMPLE_PRICES, args.font)
+    if not samples:
+        print("没有可用的样本", file=sys.stderr)
+        return 1
+
+    report = run_benchmark(samples, max(1, args.rounds), args.timeout)
+    print(json.dumps(report, ensure_ascii=False, indent=4) if args.json else format_report(report))
+    return 1 if any('error' in stats for stats in report.values()) else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
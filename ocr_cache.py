@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ocr_pool import pipeline_id
+
+DEFAULT_CAPACITY = 4096
+
+
+def _to_json(value):
+    """OCR 结果中的 numpy 数值转换为 Python 类型"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+class OcrCache:
+    """
+    OCR 结果 LRU 缓存
+
+    键为识别管线（语言及是否共用引擎）、方向分类开关和裁剪图像内容的哈希，同一张截图只识别一次，
+    切换 ocr_shared_engine 后不会命中另一种配置的结果。
+    指定 path 时启动时从磁盘加载，save() 时写回，重启后商品名称校验直接命中缓存。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, path: Optional[str] = None, logger=None):
+        self.capacity = max(1, capacity)
+        self.path = path
+        self.logger = logger
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def make_key(pipeline: str, image, cls: bool) -> str:
+        array = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{pipeline}|{int(cls)}|{array.shape}|{array.dtype}".encode("ascii"))
+        digest.update(array.data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """查找缓存，返回 (是否命中, 识别结果)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, result: Any):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """命中统计"""
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, len(self._entries)
+        total = hits + misses
+        return {'hits': hits, 'misses': misses, 'size': size, 'hit_rate': hits / total if total else 0.0}
+
+    def load(self):
+        """从磁盘加载缓存（按最近使用顺序保存）"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.warning("OCR缓存读取失败: %s", str(e))
+            return
+        with self._lock:
+            for key, result in list(entries.items())[-self.capacity:]:
+                self._entries[key] = result
+        if self.logger:
+            self.logger.info("已加载 %d 条OCR缓存", len(self._entries))
+
+    def save(self):
+        """写回磁盘（未指定路径时不保存）"""
+        if not self.path:
+            return
+        with self._lock:
+            entries = dict(self._entries)
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, default=_to_json)
+            os.replace(self.path + ".tmp", self.path)
+        except (OSError, TypeError) as e:
+            if self.logger:
+                self.logger.warning("OCR缓存保存失败: %s", str(e))
+
+
+class CachedOcr:
+    """在OCR引擎池（或OCR服务）前加一层结果缓存，接口与 OcrEnginePool 一致"""
+
+    def __init__(self, ocr, cache: OcrCache):
+        self._ocr = ocr
+        self.cache = cache
+
+    @property
+    def size(self) -> int:
+        return self._ocr.size
+
+    def acquire(self):
+        self._ocr.acquire()
+
+    def release(self):
+        self._ocr.release()
+
+    def submit(self, lang: str, image, cls: bool = False) -> Future:
+        key = OcrCache.make_key(pipeline_id(lang, getattr(self._ocr, 'shared', False)), image, cls)
+        found, result = self.cache.get(key)
+        if found:
+            future = Future()
+            future.set_result(result)
+            return future
+
+        future = self._ocr.submit(lang, image, cls)
+
+        def _store(done: Future):
+            if not done.cancelled() and done.exception() is None:
+                self.cache.put(key, done.result())
+
+        future.add_done_callback(_store)
+        return future
+
+    def ocr(self, lang: str, image, cls: bool = False):
+        return self.submit(lang, image, cls).result()
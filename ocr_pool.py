@@ -0,0 +1,156 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+os.environ["TQDM_DISABLE"] = "1"
+
+# 常量定义
+OCR_CONFIG = {
+    'ch': {
+        'lang': 'ch',
+        'use_angle_cls': True,  # 修正参数名
+        'cls_model_dir': None,   # 自动下载模型
+        'show_log': False
+    },
+    'en': {
+        'lang': 'en',
+        'use_angle_cls': False,  # 英文不需要角度检测
+        'show_log': False
+    }
+}
+# 共用中文识别器时 'en' 请求（价格、数量、总价）的后处理：形近字符和全角字符转换为数字与分隔符
+DIGIT_LOOKALIKES = str.maketrans({
+    **{chr(0xFF10 + digit): str(digit) for digit in range(10)},
+    'O': '0', 'o': '0', '〇': '0', 'l': '1', 'I': '1', '|': '1', '丨': '1', '，': ',', '。': '.',
+})
+NUMERIC_CHARS = frozenset("0123456789,.")
+
+
+def pipeline_id(lang: str, shared: bool) -> str:
+    """实际处理 lang 请求的识别管线：共用引擎时 'en' 请求由中文引擎识别后只保留数字，结果与英文引擎不同"""
+    return 'ch+digits' if shared and lang == 'en' else lang
+
+
+def filter_digits(result: Any) -> Any:
+    """只保留识别结果中的数字和分隔符，去掉不含数字的行，结构与 PaddleOCR 原始结果一致"""
+    if not result or not result[0]:
+        return result
+    lines = []
+    for box, (text, confidence) in result[0]:
+        text = ''.join(char for char in text.translate(DIGIT_LOOKALIKES) if char in NUMERIC_CHARS)
+        if any(char.isdigit() for char in text):
+            lines.append([box, (text, confidence)])
+    return [lines or None]
+
+
+class OcrEnginePool:
+    """
+    共享的OCR引擎池
+
+    多个抢购线程通过请求队列提交识别任务，由池内固定数量的引擎线程处理，
+    内存占用只与池大小相关，与客户端数量无关。引用计数归零时释放引擎。
+    shared 为 True 时每组只创建一个中文识别管线（一个检测模型和一个识别模型），
+    'en' 请求也由它处理并只保留数字，模型内存约减半。
+    """
+
+    def __init__(self, size: int = 1, logger=None, shared: bool = False):
+        self.size = max(1, size)
+        self.shared = shared
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._users = 0
+        self._requests: Optional[queue.Queue] = None
+        self._threads: List[threading.Thread] = []
+
+    @staticmethod
+    def _create_engines(shared: bool = False) -> Dict[str, Any]:
+        """创建一组中英文识别引擎，shared 时两种语言共用同一个中文引擎"""
+        # 延迟导入 paddle，使用独立OCR服务进程时主进程无需加载
+        from paddleocr import PaddleOCR
+
+        ch = OCR_CONFIG['ch']
+        en = OCR_CONFIG['en']
+        if shared:
+            engine = PaddleOCR(use_angle_cls=ch['use_angle_cls'],
+                               lang=ch['lang'],
+                               show_log=ch['show_log'])
+            return {'ch': engine, 'en': engine}
+        return {
+            'ch': PaddleOCR(use_angle_cls=ch['use_angle_cls'],
+                            lang=ch['lang'],
+                            show_log=ch['show_log']),
+            'en': PaddleOCR(use_angle_cls=en['use_angle_cls'],
+                            lang=en['lang'],
+                            show_log=en['show_log']),
+        }
+
+    def acquire(self):
+        """登记一个使用者，首次登记时初始化引擎"""
+        with self._lock:
+            if not self._threads:
+                engines = [self._create_engines(self.shared) for _ in range(self.size)]
+                self._requests = queue.Queue()
+                self._threads = [
+                    threading.Thread(target=self._serve,
+                                     args=(self._requests, engine_set, self.shared),
+                                     name=f"ocr-engine-{i}",
+                                     daemon=True)
+                    for i, engine_set in enumerate(engines)
+                ]
+                for thread in self._threads:
+                    thread.start()
+                if self.logger:
+                    self.logger.debug("OCR引擎池初始化成功 (%d 组引擎%s)", self.size,
+                                      "，中英文共用" if self.shared else "")
+            self._users += 1
+
+    def release(self):
+        """注销一个使用者，最后一个使用者离开时释放引擎"""
+        with self._lock:
+            if self._users == 0:
+                return
+            self._users -= 1
+            if self._users == 0:
+                self._shutdown()
+
+    def _shutdown(self):
+        """通知引擎线程退出并释放引擎（不等待正在进行的识别，避免阻塞停止操作）"""
+        for _ in self._threads:
+            self._requests.put(None)
+        self._threads = []
+        self._requests = None
+        if self.logger:
+            self.logger.debug("OCR资源已释放")
+
+    def submit(self, lang: str, image, cls: bool = False) -> Future:
+        """提交识别请求，返回 Future"""
+        requests = self._requests
+        if requests is None:
+            raise RuntimeError("OCR引擎池未启动")
+        future = Future()
+        requests.put((future, lang, image, cls))
+        return future
+
+    def ocr(self, lang: str, image, cls: bool = False):
+        """同步识别，返回 PaddleOCR 原始结果"""
+        return self.submit(lang, image, cls).result()
+
+    @staticmethod
+    def _serve(requests: queue.Queue, engines: Dict[str, Any], shared: bool = False):
+        """引擎线程主循环"""
+        while True:
+            item = requests.get()
+            if item is None:
+                break
+            future, lang, image, cls = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = engines[lang].ocr(image, cls=cls)
+                if shared and lang == 'en':
+                    result = filter_digits(result)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
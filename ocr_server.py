@@ -0,0 +1,230 @@
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_SLOT_COUNT = 8
+DEFAULT_SLOT_SIZE = 1024 * 1024  # 单个截图槽位 1MB，足够容纳常见的区域截图
+SERVER_START_TIMEOUT = 180  # 模型首次下载/加载可能较慢
+SERVER_JOIN_TIMEOUT = 3
+SLOT_WAIT_TIMEOUT = 2.0  # 等待空闲槽位的最长时间，正常识别远小于该值，超时说明服务进程已卡住
+SLOT_POLL_INTERVAL = 0.05  # 等待槽位期间检查服务进程是否存活的间隔
+
+
+def _server_main(conn, shm_name: str, slot_size: int, pool_size: int, shared: bool = False):
+    """OCR 服务进程入口：从共享内存读取截图，通过管道返回识别结果"""
+    # 只在子进程中导入 paddle，避免主进程加载模型
+    from ocr_pool import OcrEnginePool
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    pool = OcrEnginePool(size=pool_size, shared=shared)
+    try:
+        pool.acquire()
+    except Exception as e:
+        conn.send(('failed', None, str(e)))
+        shm.close()
+        return
+    conn.send(('ready', None, None))
+
+    send_lock = threading.Lock()
+
+    def reply(request_id, future):
+        try:
+            payload = ('ok', request_id, future.result())
+        except Exception as e:
+            payload = ('error', request_id, str(e))
+        with send_lock:
+            conn.send(payload)
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+
+            request_id, slot, shape, dtype, lang, cls, inline = message
+            if inline is not None:
+                image = inline
+            else:
+                # 直接引用共享内存，客户端在收到结果前不会复用该槽位
+                image = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=slot * slot_size)
+            pool.submit(lang, image, cls).add_done_callback(partial(reply, request_id))
+    finally:
+        pool.release()
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+class OcrServerClient:
+    """
+    独立进程OCR服务的客户端
+
+    截图写入共享内存环形缓冲区的空闲槽位，请求和结果通过管道传递，
+    同时允许 slot_count 个请求在途。接口与 OcrEnginePool 一致，可直接替换。
+    """
+
+    def __init__(self, size: int = 1, slot_count: int = DEFAULT_SLOT_COUNT,
+                 slot_size: int = DEFAULT_SLOT_SIZE, logger=None, shared: bool = False):
+        self.size = max(1, size)
+        self.shared = shared
+        self.slot_count = max(1, slot_count)
+        self.slot_size = slot_size
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error: Optional[str] = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._conn = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._receiver: Optional[threading.Thread] = None
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        self._pending: Dict[int, Tuple[Future, Optional[int]]] = {}
+        self._request_ids = itertools.count()
+
+    def start(self):
+        """启动服务进程（模型在后台加载，不阻塞调用方）"""
+        with self._lock:
+            if self._process is not None:
+                return
+            self._error = None
+            self._ready.clear()
+            self._shm = shared_memory.SharedMemory(create=True, size=self.slot_count * self.slot_size)
+            self._free_slots = queue.Queue()
+            for slot in range(self.slot_count):
+                self._free_slots.put(slot)
+
+            self._conn, child_conn = multiprocessing.Pipe(duplex=True)
+            self._process = multiprocessing.Process(
+                target=_server_main,
+                args=(child_conn, self._shm.name, self.slot_size, self.size, self.shared),
+                name="ocr-server",
+                daemon=True
+            )
+            self._process.start()
+            child_conn.close()
+
+            self._receiver = threading.Thread(target=self._receive_loop, name="ocr-server-receiver", daemon=True)
+            self._receiver.start()
+            if self.logger:
+                self.logger.info("OCR服务进程已启动 (pid=%s)", self._process.pid)
+
+    def acquire(self):
+        """等待服务就绪"""
+        self.start()
+        if not self._ready.wait(SERVER_START_TIMEOUT):
+            raise RuntimeError("OCR服务启动超时")
+        if self._error:
+            raise RuntimeError(f"OCR服务不可用: {self._error}")
+
+    def release(self):
+        """服务进程的生命周期由创建者管理，这里无需处理"""
+
+    def submit(self, lang: str, image, cls: bool = False) -> Future:
+        """提交识别请求，返回 Future"""
+        if not self._ready.is_set() or self._error:
+            raise RuntimeError("OCR服务未就绪")
+
+        image = np.ascontiguousarray(image)
+        future = Future()
+        request_id = next(self._request_ids)
+
+        slot, inline = None, None
+        if image.nbytes <= self.slot_size:
+            slot = self._acquire_slot()
+            offset = slot * self.slot_size
+            self._shm.buf[offset:offset + image.nbytes] = image.tobytes()
+        else:
+            inline = image  # 超出槽位大小时退化为通过管道传输
+
+        self._pending[request_id] = (future, slot)
+        try:
+            with self._send_lock:
+                self._conn.send((request_id, slot, image.shape, image.dtype.str, lang, cls, inline))
+        except (OSError, ValueError) as e:
+            self._finish(request_id, error=f"OCR服务通信失败: {e}")
+        return future
+
+    def ocr(self, lang: str, image, cls: bool = False):
+        """同步识别，返回 PaddleOCR 原始结果"""
+        return self.submit(lang, image, cls).result()
+
+    def _acquire_slot(self) -> int:
+        """取得一个空闲槽位；服务进程退出或超过 SLOT_WAIT_TIMEOUT 仍无空闲槽位时抛出 RuntimeError，不会无限阻塞"""
+        for _ in range(max(1, round(SLOT_WAIT_TIMEOUT / SLOT_POLL_INTERVAL))):
+            try:
+                return self._free_slots.get(timeout=SLOT_POLL_INTERVAL)
+            except queue.Empty:
+                process = self._process
+                if self._error or process is None or not process.is_alive():
+                    raise RuntimeError(f"OCR服务不可用: {self._error or 'OCR服务进程已退出'}")
+        raise RuntimeError("OCR服务无响应：所有截图槽位均未归还")
+
+    def _finish(self, request_id: int, result=None, error: Optional[str] = None):
+        """完成一个请求并归还其槽位"""
+        future, slot = self._pending.pop(request_id, (None, None))
+        if slot is not None:
+            self._free_slots.put(slot)
+        if future is None or future.cancelled():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(RuntimeError(error))
+
+    def _receive_loop(self):
+        """接收服务进程返回的结果"""
+        conn = self._conn
+        while True:
+            try:
+                status, request_id, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if status == 'ready':
+                self._ready.set()
+            elif status == 'failed':
+                self._error = payload
+                self._ready.set()
+                break
+            elif status == 'ok':
+                self._finish(request_id, result=payload)
+            else:
+                self._finish(request_id, error=payload)
+
+        # 服务进程退出，未完成的请求全部失败
+        self._error = self._error or "OCR服务进程已退出"
+        self._ready.set()
+        for request_id in list(self._pending):
+            self._finish(request_id, error=self._error)
+
+    def close(self):
+        """关闭服务进程并释放共享内存"""
+        with self._lock:
+            if self._process is None:
+                return
+            try:
+                with self._send_lock:
+                    self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self._process.join(SERVER_JOIN_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._conn.close()
+            self._shm.close()
+            self._shm.unlink()
+            self._process = None
+            if self.logger:
+                self.logger.info("OCR服务进程已关闭")
@@ -0,0 +1,226 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 1 << 20  # 每个分块一百万行，约 22MB
+FLUSH_INTERVAL = 1.0  # 写线程刷盘间隔（秒）
+WRITE_BATCH = 4096  # 写线程单次最多取出的记录数
+COLUMNS = {
+    'ts': np.float64,
+    'card': np.int32,
+    'price': np.int64,
+    'conf': np.float32,
+}
+INDEX_FILE = "index.json"
+
+
+class _Chunk:
+    """一个分块：每列一个内存映射的 .npy 文件"""
+
+    def __init__(self, directory: str, chunk_id: int, capacity: int, rows: int = 0,
+                 first_ts: float = 0.0, last_ts: float = 0.0, create: bool = False):
+        self.id = chunk_id
+        self.capacity = capacity
+        self.rows = rows
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        mode = "w+" if create else "r+"
+        self.columns = {
+            name: np.lib.format.open_memmap(
+                os.path.join(directory, f"chunk_{chunk_id:05d}_{name}.npy"),
+                mode=mode, dtype=dtype, shape=(capacity,) if create else None)
+            for name, dtype in COLUMNS.items()
+        }
+
+    def append(self, batch: Dict[str, np.ndarray], start: int, count: int):
+        """写入 batch[start:start+count]，写完后才更新行数，读者不会看到半行"""
+        end = self.rows + count
+        for name, column in self.columns.items():
+            column[self.rows:end] = batch[name][start:start + count]
+        if self.rows == 0:
+            self.first_ts = float(batch['ts'][start])
+        self.last_ts = float(batch['ts'][start + count - 1])
+        self.rows = end
+
+    def flush(self):
+        for column in self.columns.values():
+            column.flush()
+
+    def meta(self) -> Dict:
+        return {'id': self.id, 'capacity': self.capacity, 'rows': self.rows,
+                'first_ts': self.first_ts, 'last_ts': self.last_ts}
+
+
+class PriceHistoryStore:
+    """
+    列式价格历史存储
+
+    每条观测（时间、商品、价格、置信度）由后台线程批量追加到内存映射的 NumPy 分块中，
+    分块写满后自动滚动到新文件。record() 只是放入无界队列，不会阻塞抢购线程；
+    查询直接在映射数组上做向量化筛选和统计。
+    """
+
+    def __init__(self, directory: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, logger=None):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.logger = logger
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._card_ids: Dict[str, int] = {}
+        self._card_lock = threading.Lock()
+        self._chunks: List[_Chunk] = []
+        self._stop_event = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        self._writer = threading.Thread(target=self._write_loop, name="price-history-writer", daemon=True)
+        self._writer.start()
+
+    # ---- 写入 ----
+
+    def record(self, card: str, price: int, confidence: float = 1.0, timestamp: Optional[float] = None):
+        """登记一次价格观测（非阻塞）"""
+        self._queue.put((time.time() if timestamp is None else timestamp,
+                         self._card_id(card), price, confidence))
+
+    def _card_id(self, card: str) -> int:
+        card_id = self._card_ids.get(card)
+        if card_id is None:
+            with self._card_lock:
+                card_id = self._card_ids.setdefault(card, len(self._card_ids))
+        return card_id
+
+    def _drain(self) -> List[Tuple]:
+        items = []
+        try:
+            while len(items) < WRITE_BATCH:
+                items.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return items
+
+    def _write_loop(self):
+        dirty = False
+        last_flush = time.monotonic()
+        while True:
+            # 有未刷盘的数据时只等到下一次刷盘时刻，不用 wait(0) 空转
+            timeout = FLUSH_INTERVAL / 4
+            if dirty:
+                timeout = min(timeout, max(0.0, FLUSH_INTERVAL - (time.monotonic() - last_flush)))
+            stopping = self._stop_event.wait(timeout)
+            items = self._drain()
+            if items:
+                self._append(items)
+                dirty = True
+            if dirty and (stopping or time.monotonic() - last_flush >= FLUSH_INTERVAL):
+                self._flush()
+                dirty = False
+                last_flush = time.monotonic()
+            if stopping and not items:
+                break
+
+    def _append(self, items: List[Tuple]):
+        ts, cards, prices, confs = zip(*items)
+        batch = {
+            'ts': np.asarray(ts, dtype=COLUMNS['ts']),
+            'card': np.asarray(cards, dtype=COLUMNS['card']),
+            'price': np.asarray(prices, dtype=COLUMNS['price']),
+            'conf': np.asarray(confs, dtype=COLUMNS['conf']),
+        }
+        start, total = 0, len(items)
+        while start < total:
+            chunk = self._chunks[-1] if self._chunks else None
+            if chunk is None or chunk.rows == chunk.capacity:
+                if chunk is not None:
+                    chunk.flush()
+                chunk = _Chunk(self.directory, len(self._chunks), self.chunk_rows, create=True)
+                self._chunks.append(chunk)
+            count = min(total - start, chunk.capacity - chunk.rows)
+            chunk.append(batch, start, count)
+            start += count
+
+    def _flush(self):
+        if self._chunks:
+            self._chunks[-1].flush()
+        self._save_index()
+
+    # ---- 索引 ----
+
+    def _load_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self._card_ids = {name: i for i, name in enumerate(index.get("cards", []))}
+            self._chunks = [_Chunk(self.directory, meta['id'], meta['capacity'], meta['rows'],
+                                   meta['first_ts'], meta['last_ts'])
+                            for meta in index.get("chunks", [])]
+        except (OSError, ValueError, KeyError) as e:
+            if self.logger:
+                self.logger.error("价格历史索引读取失败: %s", str(e))
+
+    def _save_index(self):
+        with self._card_lock:
+            cards = sorted(self._card_ids, key=self._card_ids.get)
+        index = {'cards': cards, 'chunks': [chunk.meta() for chunk in self._chunks]}
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        """写完队列中的剩余记录并刷盘"""
+        self._stop_event.set()
+        self._writer.join()
+
+    # ---- 查询 ----
+
+    def cards(self) -> List[str]:
+        """有记录的商品名称"""
+        with self._card_lock:
+            return sorted(self._card_ids, key=self._card_ids.get)
+
+    def query(self, card: str, since: Optional[float] = None, until: Optional[float] = None
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """返回时间窗口内某商品的 (时间, 价格, 置信度) 数组"""
+        card_id = self._card_ids.get(card)
+        parts = []
+        if card_id is not None:
+            for chunk in list(self._chunks):
+                rows = chunk.rows
+                if rows == 0 or since is not None and chunk.last_ts < since \
+                        or until is not None and chunk.first_ts > until:
+                    continue
+                ts = chunk.columns['ts'][:rows]
+                mask = chunk.columns['card'][:rows] == card_id
+                if since is not None:
+                    mask &= ts >= since
+                if until is not None:
+                    mask &= ts <= until
+                parts.append((ts[mask], chunk.columns['price'][:rows][mask], chunk.columns['conf'][:rows][mask]))
+        if not parts:
+            return (np.empty(0, COLUMNS['ts']), np.empty(0, COLUMNS['price']), np.empty(0, COLUMNS['conf']))
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def stats(self, card: str, since: Optional[float] = None, until: Optional[float] = None,
+              percentiles: Sequence[float] = (10, 90)) -> Dict:
+        """时间窗口内的最小值、中位数、百分位数等统计"""
+        ts, prices, _ = self.query(card, since, until)
+        if prices.size == 0:
+            return {'count': 0}
+        values = np.percentile(prices, (50, *percentiles))
+        result = {
+            'count': int(prices.size),
+            'min': int(prices.min()),
+            'max': int(prices.max()),
+            'median': float(values[0]),
+            'last': int(prices[np.argmax(ts)]),
+        }
+        for p, value in zip(percentiles, values[1:]):
+            result[f'p{p:g}'] = float(value)
+        return result
@@ -0,0 +1,143 @@
+import time
+from typing import Callable, Optional
+
+import numpy as np
+from PyQt5.QtCore import Qt, QTimer, QPointF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLabel, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView)
+
+from price_history import PriceHistoryStore
+
+REFRESH_INTERVAL_MS = 5000
+MAX_CHART_POINTS = 500  # 图表最多绘制的点数，超出时等间隔抽样
+TIME_WINDOWS = [
+    ("最近1小时", 3600),
+    ("最近24小时", 86400),
+    ("最近7天", 7 * 86400),
+    ("全部", None),
+]
+COLUMNS = ["商品", "次数", "最低", "中位数", "P10", "P90", "最新"]
+
+
+class PriceChart(QWidget):
+    """价格折线图"""
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setMinimumHeight(160)
+        self._ts = np.empty(0)
+        self._prices = np.empty(0)
+
+    def set_series(self, ts: np.ndarray, prices: np.ndarray):
+        if ts.size > MAX_CHART_POINTS:
+            step = int(np.ceil(ts.size / MAX_CHART_POINTS))
+            ts, prices = ts[::step], prices[::step]
+        self._ts, self._prices = ts, prices
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.rect().adjusted(50, 10, -10, -20)
+        painter.setPen(QPen(QColor("#999999")))
+        painter.drawRect(rect)
+        if self._prices.size < 2:
+            painter.drawText(rect, Qt.AlignCenter, "暂无数据")
+            return
+
+        low, high = float(self._prices.min()), float(self._prices.max())
+        start, end = float(self._ts[0]), float(self._ts[-1])
+        span_y = high - low or 1.0
+        span_x = end - start or 1.0
+        xs = rect.left() + (self._ts - start) / span_x * rect.width()
+        ys = rect.bottom() - (self._prices - low) / span_y * rect.height()
+
+        painter.drawText(2, rect.top() + 10, f"{high:,.0f}")
+        painter.drawText(2, rect.bottom(), f"{low:,.0f}")
+        painter.drawText(rect.left(), rect.bottom() + 15, time.strftime("%m-%d %H:%M", time.localtime(start)))
+        painter.drawText(rect.right() - 70, rect.bottom() + 15, time.strftime("%m-%d %H:%M", time.localtime(end)))
+        painter.setPen(QPen(QColor("#1E90FF"), 1.5))
+        painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(xs, ys)]))
+
+
+class PriceHistoryView(QWidget):
+    """价格统计页：各商品在时间窗口内的价格统计与走势"""
+
+    def __init__(self, store_getter: Callable[[], Optional[PriceHistoryStore]], parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.store_getter = store_getter
+        self._setup_ui()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_INTERVAL_MS)
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("时间范围:"))
+        self.window_combo = QComboBox()
+        for label, seconds in TIME_WINDOWS:
+            self.window_combo.addItem(label, seconds)
+        self.window_combo.currentIndexChanged.connect(self.refresh)
+        toolbar.addWidget(self.window_combo)
+        toolbar.addStretch()
+        layout.addLayout(toolbar)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.itemSelectionChanged.connect(self.refresh_chart)
+        layout.addWidget(self.table)
+
+        self.chart = PriceChart()
+        layout.addWidget(self.chart)
+
+    def _since(self) -> Optional[float]:
+        seconds = self.window_combo.currentData()
+        return time.time() - seconds if seconds else None
+
+    def _selected_card(self) -> Optional[str]:
+        row = self.table.currentRow()
+        item = self.table.item(row, 0) if row >= 0 else None
+        return item.text() if item else None
+
+    def refresh(self):
+        """刷新统计表格（仅在页面可见时）"""
+        store = self.store_getter()
+        if store is None or not self.isVisible():
+            return
+        selected = self._selected_card()
+        since = self._since()
+        rows = [(card, store.stats(card, since)) for card in store.cards()]
+        rows = [(card, stats) for card, stats in rows if stats['count']]
+
+        self.table.blockSignals(True)
+        self.table.setRowCount(len(rows))
+        for row, (card, stats) in enumerate(rows):
+            values = [card, stats['count'], stats['min'], stats['median'], stats['p10'], stats['p90'], stats['last']]
+            for column, value in enumerate(values):
+                text = value if isinstance(value, str) else f"{value:,.0f}"
+                self.table.setItem(row, column, QTableWidgetItem(text))
+            if card == selected:
+                self.table.selectRow(row)
+        self.table.blockSignals(False)
+        self.refresh_chart()
+
+    def refresh_chart(self):
+        """绘制选中商品的价格走势"""
+        store = self.store_getter()
+        card = self._selected_card()
+        if store is None or card is None:
+            self.chart.set_series(np.empty(0), np.empty(0))
+            return
+        ts, prices, _ = store.query(card, self._since())
+        order = np.argsort(ts, kind="stable")
+        self.chart.set_series(ts[order], prices[order])
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
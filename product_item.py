@@ -1,19 +1,46 @@
-import time
+from typing import Any, Dict, List
 
-from PyQt5 import QtCore
-from PyQt5.QtCore import QTimer
-from PyQt5.QtWidgets import QWidget, QBoxLayout, QMessageBox, QMainWindow
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableView,
+                             QHeaderView, QAbstractItemView, QStyledItemDelegate, QSpinBox,
+                             QDoubleSpinBox, QMessageBox, QMainWindow)
 
 from config import read_config_field, write_config_field
-from product_item_ui import Ui_ProductFrom
 from selection_window import SelectionWindow
-from utils import check_game_window
+from utils import check_game_window, to_config_position
+
+SAVE_DELAY_MS = 500  # 连续编辑合并为一次保存
+SORT_ROLE = Qt.UserRole
+
+COLUMN_ENABLED, COLUMN_NAME, COLUMN_PRICE, COLUMN_RANGE, COLUMN_BUY, COLUMN_QUANTITY, COLUMN_BOUGHT, \
+    COLUMN_POSITION = range(8)
+COLUMNS = [
+    # (表头, 配置字段)
+    ("启用", "enable_buy"),
+    ("物品名称", "name"),
+    ("期望价格", "expect_price"),
+    ("浮动比率", "floating_percentage_range"),
+    ("购买数量", "buy_count"),
+    ("每次数量", "buy_quantity"),
+    ("已购数量", "already_buy_count"),
+    ("当前位置", "position"),
+]
+EDITABLE_COLUMNS = {COLUMN_NAME, COLUMN_PRICE, COLUMN_RANGE, COLUMN_BUY, COLUMN_QUANTITY}
+FIELD_DEFAULTS = {"buy_quantity": 1}  # 旧配置中没有的字段
+STATEMENT = ("物品名称：一定要跟交易行的物品名称完全一致\n\n"
+             "期望价格：你期望购买的最低价格\n\n"
+             "浮动比率：期望价格超过这个比率也会购买，如果不想以期望价格的更高价格购买，就填0\n\n"
+             "购买数量：超过这个购买数量就会停止购买\n\n"
+             "每次数量：一次购买的件数，需要在基础配置中选择数量输入框和总价位置\n\n"
+             "当前位置：房卡在你交易行收藏页面的坐标\n\n"
+             "双击单元格修改，修改会自动保存；点击表头排序，搜索框按名称筛选")
 
 
 class ProductConfigItemData:
     """商品配置项数据"""
 
-    def __init__(self, name, type, expect_price, floating_percentage_range, enable_buy, buy_count, already_buy_count, position):
+    def __init__(self, name, type, expect_price, floating_percentage_range, enable_buy, buy_count, already_buy_count, position,
+                 buy_quantity=1):
         self.name = name
         self.type = type
         self.expect_price = expect_price
@@ -22,6 +49,7 @@ class ProductConfigItemData:
         self.buy_count = buy_count
         self.already_buy_count = already_buy_count
         self.position = position
+        self.buy_quantity = buy_quantity
 
     def to_dict(self):
         return {
@@ -31,149 +59,207 @@ class ProductConfigItemData:
             "floating_percentage_range": self.floating_percentage_range,
             "enable_buy": self.enable_buy,
             "buy_count": self.buy_count,
+            "buy_quantity": self.buy_quantity,
             "already_buy_count": self.already_buy_count,
             "position": self.position
         }
 
 
-class ProductItem(QWidget):
-    save_signal = QtCore.pyqtSignal(ProductConfigItemData, int)
-    remove_signal = QtCore.pyqtSignal(int)
-    select_position_signal = QtCore.pyqtSignal(int)
+class ProductTableModel(QAbstractTableModel):
+    """
+    商品配置表格模型
 
-    position = []
+    直接持有 config.json 中的 products 列表，编辑后启动定时器，
+    SAVE_DELAY_MS 内的所有修改合并为一次写盘。
+    """
 
-    def __init__(self, index: int):
+    def __init__(self, products: List[Dict[str, Any]]):
         super().__init__()
-        self.index = index
-        self.form = Ui_ProductFrom()
-        self.form.setupUi(self)
-        self.__connect_signal_to_slot__()
+        self.products = products
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self.save)
 
-    def set_data(self, data: ProductConfigItemData):
-        """设置商品配置项数据"""
-        self.form.product_name.setText(data.name)
-        self.form.expect_price.setValue(data.expect_price)
-        self.form.floating_percentage_range.setValue(data.floating_percentage_range)
-        self.form.buy_count.setValue(data.buy_count)
-        self.form.already_buy_count.setText(str(data.already_buy_count))
-        self.form.position.setText(str(data.position))
-        self.form.product_item_box.setTitle(data.name)
-        self.form.product_item_box.setChecked(data.enable_buy)
-        self.position = data.position
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.products)
 
-    def save(self):
-        """保存商品配置项数据"""
-        data = ProductConfigItemData(
-            name=self.form.product_name.text(),
-            type="",
-            expect_price=self.form.expect_price.value(),
-            floating_percentage_range=self.form.floating_percentage_range.value(),
-            enable_buy=self.form.product_item_box.isChecked(),
-            buy_count=int(self.form.buy_count.value()),
-            already_buy_count=int(self.form.already_buy_count.text()),
-            position=self.position
-        )
-        self.save_signal.emit(data, self.index)
-        return data
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
 
-    def remove(self):
-        """删除商品配置项数据"""
-        self.remove_signal.emit(self.index)
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section][0]
+        return None
 
-    def select_position(self):
-        """选择商品位置"""
-        self.select_position_signal.emit(self.index)
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        field = COLUMNS[column][1]
+        value = self.products[index.row()].get(field, FIELD_DEFAULTS.get(field))
+        if column == COLUMN_ENABLED:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if value else Qt.Unchecked
+            if role == SORT_ROLE:
+                return int(bool(value))
+            return None
+        if role in (Qt.EditRole, SORT_ROLE):
+            return str(value) if column == COLUMN_POSITION else value
+        if role == Qt.DisplayRole:
+            return str(value) if value is not None else ""
+        return None
 
-    def clear_buy_count(self):
-        """清空已购买数量"""
-        self.form.already_buy_count.setText("0")
-        self.save()
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == COLUMN_ENABLED:
+            flags |= Qt.ItemIsUserCheckable
+        elif index.column() in EDITABLE_COLUMNS:
+            flags |= Qt.ItemIsEditable
+        return flags
 
-    def set_name(self, name: str):
-        """设置商品名称"""
-        self.form.product_item_box.setTitle(name)
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        column = index.column()
+        if column == COLUMN_ENABLED and role == Qt.CheckStateRole:
+            value = value == Qt.Checked
+        elif column not in EDITABLE_COLUMNS or role != Qt.EditRole:
+            return False
+        self.products[index.row()][COLUMNS[column][1]] = value
+        self.dataChanged.emit(index, index, [role])
+        self.schedule_save()
+        return True
+
+    def update_field(self, row: int, field: str, value, save: bool = True):
+        """修改某行的字段（框选位置、清空已购数量、同步购买计数等）"""
+        self.products[row][field] = value
+        column = [name for _, name in COLUMNS].index(field)
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+        if save:
+            self.schedule_save()
+
+    def add_product(self, data: ProductConfigItemData) -> int:
+        row = len(self.products)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.products.append(data.to_dict())
+        self.endInsertRows()
+        self.schedule_save()
+        return row
+
+    def remove_rows(self, rows: List[int]):
+        for row in sorted(set(rows), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.products.pop(row)
+            self.endRemoveRows()
+        self.schedule_save()
+
+    def schedule_save(self):
+        self._save_timer.start()
+
+    def flush(self):
+        """有尚未保存的修改时立即保存"""
+        if self._save_timer.isActive():
+            self.save()
+
+    def save(self):
+        """立即写入配置文件"""
+        self._save_timer.stop()
+        write_config_field("products", self.products)
+
+
+class ProductItemDelegate(QStyledItemDelegate):
+    """按列提供编辑器，只有正在编辑的单元格才会创建控件"""
+
+    def createEditor(self, parent, option, index):
+        column = index.column()
+        if column == COLUMN_PRICE:
+            editor = QSpinBox(parent)
+            editor.setRange(1, 10000000)
+            return editor
+        if column == COLUMN_RANGE:
+            editor = QDoubleSpinBox(parent)
+            editor.setRange(0.0, 1.0)
+            editor.setSingleStep(0.01)
+            return editor
+        if column == COLUMN_BUY:
+            editor = QSpinBox(parent)
+            editor.setRange(0, 99999)
+            return editor
+        if column == COLUMN_QUANTITY:
+            editor = QSpinBox(parent)
+            editor.setRange(1, 9999)
+            return editor
+        return super().createEditor(parent, option, index)
 
-    def __connect_signal_to_slot__(self):
-        """连接信号"""
-        self.form.save_btn.clicked.connect(self.save)
-        self.form.del_btn.clicked.connect(self.remove)
-        self.form.select_position_btn.clicked.connect(self.select_position)
-        self.form.product_item_box.toggled.connect( self.save)
-        self.form.clear_buy_btn.clicked.connect(self.clear_buy_count)
-        self.form.product_name.textChanged.connect(lambda: self.set_name(self.form.product_name.text()))
 
 class Products:
-    def __init__(self, layout: QBoxLayout, parent:Ui_ProductFrom = None, window:QMainWindow = None):
-        """商品配置项管理类"""
+    def __init__(self, parent=None, window: QMainWindow = None):
+        """商品配置管理类：表格模型 + 排序筛选代理，替换设计器中的滚动区域"""
         super().__init__()
         self.parent = parent
         self.window = window
         self.selection_window = SelectionWindow(self)
-        self.selection_window_index = None
-        self.layout = layout
-        self.products = []
-        self.product_widgets = []
-        self.read_config()
+        self.selection_window_row = None
+        self.model = ProductTableModel(read_config_field("products", []))
+        self.proxy = QSortFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(SORT_ROLE)
+        self.proxy.setFilterKeyColumn(COLUMN_NAME)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
         self.init_ui()
+        self.__connect_signal_to_slot__()
+
+    @property
+    def products(self) -> List[Dict[str, Any]]:
+        return self.model.products
 
     def init_ui(self):
         """初始化UI"""
-        for index, item in enumerate(self.products):
-            data = ProductConfigItemData(
-                name=item.get("name"),
-                type=item.get("type"),
-                expect_price=item.get("expect_price"),
-                floating_percentage_range=item.get("floating_percentage_range"),
-                enable_buy=item.get("enable_buy"),
-                buy_count=item.get("buy_count"),
-                already_buy_count=item.get("already_buy_count"),
-                position=item.get("position")
-            )
-            self.add_product_item(data, index)
-
-    def add_product_item(self, data: ProductConfigItemData, index: int):
-        product_item = ProductItem(index)
-        product_item.set_data(data)
-        product_item.save_signal.connect(self.write_config)
-        product_item.remove_signal.connect(self.remove_product)
-        product_item.select_position_signal.connect(self.select_position)
-        self.product_widgets.append(product_item)
-        self.layout.addWidget(product_item)
-
-    def select_position(self, index:int):
-        """选择商品位置"""
-        self.selection_window_index = index
-        if check_game_window(self, self.window) is False:
-            QMessageBox.warning(self.window, "提示", "请先启动游戏")
-            return
+        self.widget = QWidget()
+        layout = QVBoxLayout(self.widget)
+        layout.setContentsMargins(0, 0, 0, 0)
 
-    def set_selection_area(self, x1, y1, x2, y2):
-        """设置选择区域"""
-        self.product_widgets[self.selection_window_index].position = [x1, y1, x2, y2]
-        self.product_widgets[self.selection_window_index].form.position.setText(str([x1, y1, x2, y2]))
-        self.product_widgets[self.selection_window_index].save()
-        self.selection_window.hide()
+        toolbar = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("按名称筛选")
+        self.add_btn = QPushButton("添加")
+        self.remove_btn = QPushButton("删除")
+        self.select_position_btn = QPushButton("选择位置")
+        self.clear_buy_btn = QPushButton("清空已购")
+        toolbar.addWidget(self.search_edit)
+        for button in (self.add_btn, self.remove_btn, self.select_position_btn, self.clear_buy_btn):
+            toolbar.addWidget(button)
+        layout.addLayout(toolbar)
 
-    def read_config(self):
-        """读取配置文件"""
-        self.products = read_config_field("products")
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setItemDelegate(ProductItemDelegate(self.view))
+        self.view.setSortingEnabled(True)
+        self.view.sortByColumn(-1, Qt.AscendingOrder)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.view.horizontalHeader().setSectionResizeMode(COLUMN_NAME, QHeaderView.Stretch)
+        layout.addWidget(self.view)
 
-    def write_config(self,data:ProductConfigItemData, index:int):
-        """写入配置文件"""
-        self.products[index] = data.to_dict()
-        write_config_field("products", self.products)
+        # 设计器中的滚动区域每个商品一个表单，商品多时很慢，这里换成只绘制可见行的表格
+        self.parent.product_config_scroll_area.hide()
+        self.parent.horizontalLayout_2.addWidget(self.widget)
+        self.parent.label.setText(STATEMENT)
 
-    def remove_product(self, index:int):
-        """删除商品配置项数据"""
-        self.products.pop(index)
-        write_config_field("products", self.products)
-        # 更新布局
-        self.product_widgets[index].deleteLater()
+    def _selected_rows(self) -> List[int]:
+        """选中行在模型中的行号"""
+        return sorted({self.proxy.mapToSource(index).row()
+                       for index in self.view.selectionModel().selectedRows()})
 
     def add_product(self):
         """添加商品配置项"""
-        index = len(self.product_widgets)
+        self.search_edit.clear()
         data = ProductConfigItemData(
             name="",
             type="",
@@ -184,7 +270,50 @@ class Products:
             already_buy_count=0,
             position=[0, 0]
         )
-        self.add_product_item(data, index)
-        self.products.append(data.to_dict())
-        self.write_config(data, index)
+        row = self.model.add_product(data)
+        index = self.proxy.mapFromSource(self.model.index(row, COLUMN_NAME))
+        self.view.scrollTo(index)
+        self.view.setCurrentIndex(index)
+        self.view.edit(index)
 
+    def remove_products(self):
+        """删除选中的商品"""
+        rows = self._selected_rows()
+        if rows:
+            self.model.remove_rows(rows)
+
+    def clear_buy_count(self):
+        """清空选中商品的已购买数量"""
+        for row in self._selected_rows():
+            self.model.update_field(row, "already_buy_count", 0)
+
+    def select_position(self):
+        """选择商品位置"""
+        rows = self._selected_rows()
+        if len(rows) != 1:
+            QMessageBox.warning(self.window, "提示", "请先选中一个商品")
+            return
+        self.selection_window_row = rows[0]
+        if check_game_window(self, self.window) is False:
+            QMessageBox.warning(self.window, "提示", "请先启动游戏")
+            return
+
+    def set_selection_area(self, x1, y1, x2, y2):
+        """设置选择区域"""
+        x1, y1 = to_config_position(getattr(self, "game_window", None), x1, y1)
+        self.model.update_field(self.selection_window_row, "position", [x1, y1, x2, y2])
+        self.selection_window.hide()
+
+    def update_buy_count(self, index: int, card: dict):
+        """抢购线程购买成功后同步已购数量（引擎已写入文件，这里不再保存）"""
+        if index >= len(self.products) or self.products[index].get("name") != card.get("name"):
+            return
+        self.model.update_field(index, "already_buy_count", card["already_buy_count"], save=False)
+
+    def __connect_signal_to_slot__(self):
+        """连接信号"""
+        self.search_edit.textChanged.connect(self.proxy.setFilterFixedString)
+        self.add_btn.clicked.connect(self.add_product)
+        self.remove_btn.clicked.connect(self.remove_products)
+        self.select_position_btn.clicked.connect(self.select_position)
+        self.clear_buy_btn.clicked.connect(self.clear_buy_count)
@@ -1,143 +0,0 @@
-# -*- coding: utf-8 -*-
-
-# Form implementation generated from reading ui file '.\product_item.ui'
-#
-# Created by: PyQt5 UI code generator 5.15.11
-#
-# WARNING: Any manual changes made to this file will be lost when pyuic5 is
-# run again.  Do not edit this file unless you know what you are doing.
-
-
-from PyQt5 import QtCore, QtGui, QtWidgets
-
-
-class Ui_ProductFrom(object):
-    def setupUi(self, ProductFrom):
-        ProductFrom.setObjectName("ProductFrom")
-        ProductFrom.resize(350, 300)
-        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
-        sizePolicy.setHorizontalStretch(0)
-        sizePolicy.setVerticalStretch(0)
-        sizePolicy.setHeightForWidth(ProductFrom.sizePolicy().hasHeightForWidth())
-        ProductFrom.setSizePolicy(sizePolicy)
-        ProductFrom.setMinimumSize(QtCore.QSize(350, 300))
-        self.product_item_box = QtWidgets.QGroupBox(ProductFrom)
-        self.product_item_box.setEnabled(True)
-        self.product_item_box.setGeometry(QtCore.QRect(0, 0, 350, 300))
-        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
-        sizePolicy.setHorizontalStretch(0)
-        sizePolicy.setVerticalStretch(0)
-        sizePolicy.setHeightForWidth(self.product_item_box.sizePolicy().hasHeightForWidth())
-        self.product_item_box.setSizePolicy(sizePolicy)
-        self.product_item_box.setMinimumSize(QtCore.QSize(0, 0))
-        self.product_item_box.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
-        self.product_item_box.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignTop)
-        self.product_item_box.setFlat(False)
-        self.product_item_box.setCheckable(True)
-        self.product_item_box.setObjectName("product_item_box")
-        self.horizontalLayout_3 = QtWidgets.QHBoxLayout(self.product_item_box)
-        self.horizontalLayout_3.setSizeConstraint(QtWidgets.QLayout.SetMinAndMaxSize)
-        self.horizontalLayout_3.setContentsMargins(6, 6, 6, 6)
-        self.horizontalLayout_3.setSpacing(6)
-        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
-        self.verticalLayout_2 = QtWidgets.QVBoxLayout()
-        self.verticalLayout_2.setObjectName("verticalLayout_2")
-        self.product_item_form = QtWidgets.QFormLayout()
-        self.product_item_form.setSizeConstraint(QtWidgets.QLayout.SetFixedSize)
-        self.product_item_form.setFieldGrowthPolicy(QtWidgets.QFormLayout.ExpandingFieldsGrow)
-        self.product_item_form.setRowWrapPolicy(QtWidgets.QFormLayout.WrapLongRows)
-        self.product_item_form.setLabelAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
-        self.product_item_form.setContentsMargins(0, 0, 0, 0)
-        self.product_item_form.setObjectName("product_item_form")
-        self.label = QtWidgets.QLabel(self.product_item_box)
-        self.label.setMinimumSize(QtCore.QSize(100, 0))
-        self.label.setObjectName("label")
-        self.product_item_form.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.label)
-        self.product_name = QtWidgets.QLineEdit(self.product_item_box)
-        self.product_name.setObjectName("product_name")
-        self.product_item_form.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.product_name)
-        self.label_2 = QtWidgets.QLabel(self.product_item_box)
-        self.label_2.setObjectName("label_2")
-        self.product_item_form.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.label_2)
-        self.expect_price = QtWidgets.QSpinBox(self.product_item_box)
-        self.expect_price.setMinimum(1)
-        self.expect_price.setMaximum(10000000)
-        self.expect_price.setObjectName("expect_price")
-        self.product_item_form.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.expect_price)
-        self.label_3 = QtWidgets.QLabel(self.product_item_box)
-        self.label_3.setObjectName("label_3")
-        self.product_item_form.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.label_3)
-        self.floating_percentage_range = QtWidgets.QDoubleSpinBox(self.product_item_box)
-        self.floating_percentage_range.setProperty("showGroupSeparator", False)
-        self.floating_percentage_range.setSuffix("")
-        self.floating_percentage_range.setMaximum(1.0)
-        self.floating_percentage_range.setSingleStep(0.01)
-        self.floating_percentage_range.setObjectName("floating_percentage_range")
-        self.product_item_form.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.floating_percentage_range)
-        self.label_9 = QtWidgets.QLabel(self.product_item_box)
-        self.label_9.setObjectName("label_9")
-        self.product_item_form.setWidget(3, QtWidgets.QFormLayout.LabelRole, self.label_9)
-        self.buy_count = QtWidgets.QSpinBox(self.product_item_box)
-        self.buy_count.setObjectName("buy_count")
-        self.product_item_form.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.buy_count)
-        self.label_11 = QtWidgets.QLabel(self.product_item_box)
-        self.label_11.setObjectName("label_11")
-        self.product_item_form.setWidget(4, QtWidgets.QFormLayout.LabelRole, self.label_11)
-        self.already_buy_count = QtWidgets.QLabel(self.product_item_box)
-        self.already_buy_count.setObjectName("already_buy_count")
-        self.product_item_form.setWidget(4, QtWidgets.QFormLayout.FieldRole, self.already_buy_count)
-        self.clear_buy_btn = QtWidgets.QPushButton(self.product_item_box)
-        self.clear_buy_btn.setObjectName("clear_buy_btn")
-        self.product_item_form.setWidget(5, QtWidgets.QFormLayout.FieldRole, self.clear_buy_btn)
-        self.label_10 = QtWidgets.QLabel(self.product_item_box)
-        self.label_10.setObjectName("label_10")
-        self.product_item_form.setWidget(6, QtWidgets.QFormLayout.LabelRole, self.label_10)
-        self.position = QtWidgets.QLabel(self.product_item_box)
-        self.position.setObjectName("position")
-        self.product_item_form.setWidget(6, QtWidgets.QFormLayout.FieldRole, self.position)
-        self.select_position_btn = QtWidgets.QPushButton(self.product_item_box)
-        self.select_position_btn.setObjectName("select_position_btn")
-        self.product_item_form.setWidget(7, QtWidgets.QFormLayout.FieldRole, self.select_position_btn)
-        self.verticalLayout_2.addLayout(self.product_item_form)
-        self.horizontalLayout_4 = QtWidgets.QHBoxLayout()
-        self.horizontalLayout_4.setObjectName("horizontalLayout_4")
-        self.save_btn = QtWidgets.QPushButton(self.product_item_box)
-        self.save_btn.setObjectName("save_btn")
-        self.horizontalLayout_4.addWidget(self.save_btn)
-        self.del_btn = QtWidgets.QPushButton(self.product_item_box)
-        self.del_btn.setObjectName("del_btn")
-        self.horizontalLayout_4.addWidget(self.del_btn)
-        self.verticalLayout_2.addLayout(self.horizontalLayout_4)
-        self.verticalLayout_2.setStretch(0, 5)
-        self.verticalLayout_2.setStretch(1, 1)
-        self.horizontalLayout_3.addLayout(self.verticalLayout_2)
-
-        self.retranslateUi(ProductFrom)
-        QtCore.QMetaObject.connectSlotsByName(ProductFrom)
-
-    def retranslateUi(self, ProductFrom):
-        _translate = QtCore.QCoreApplication.translate
-        ProductFrom.setWindowTitle(_translate("ProductFrom", "Form"))
-        self.product_item_box.setTitle(_translate("ProductFrom", "钥匙卡"))
-        self.label.setText(_translate("ProductFrom", "物品名称:"))
-        self.label_2.setText(_translate("ProductFrom", "期望价格:"))
-        self.label_3.setText(_translate("ProductFrom", "浮动比率"))
-        self.label_9.setText(_translate("ProductFrom", "购买数量"))
-        self.label_11.setText(_translate("ProductFrom", "当前购买数量"))
-        self.already_buy_count.setText(_translate("ProductFrom", "1"))
-        self.clear_buy_btn.setText(_translate("ProductFrom", "点击清空"))
-        self.label_10.setText(_translate("ProductFrom", "当前位置"))
-        self.position.setText(_translate("ProductFrom", "[1,2,3,4]"))
-        self.select_position_btn.setText(_translate("ProductFrom", "点击选择"))
-        self.save_btn.setText(_translate("ProductFrom", "保存"))
-        self.del_btn.setText(_translate("ProductFrom", "删除"))
-
-
-if __name__ == "__main__":
-    import sys
-    app = QtWidgets.QApplication(sys.argv)
-    ProductFrom = QtWidgets.QWidget()
-    ui = Ui_ProductFrom()
-    ui.setupUi(ProductFrom)
-    ProductFrom.show()
-    sys.exit(app.exec_())
@@ -0,0 +1,84 @@
+import threading
+from collections import Counter
+from enum import Enum
+from typing import Dict, Optional
+
+import numpy as np
+
+from card_plan import CardPlan
+
+
+class FlowState(Enum):
+    """购买流程所处的界面"""
+    HALL = "交易行"
+    PRODUCT = "商品页"
+    CONFIRM = "等待购买结果"
+    RESULT = "购买结果"
+    UNKNOWN = "未知界面"
+
+
+DEFAULT_STATE_TIMEOUTS = {
+    # 等待进入该界面的最长时间（秒），超时后识别当前界面并按最短路径恢复；等待购买结果的超时为 buy_confirm_interval
+    'product': 1.0,
+    'quantity': 0.5,  # 输入购买数量后等待数量和总价刷新
+    'hall': 0.5,
+}
+MAX_RECOVERY_STEPS = 3
+
+# 从各界面回到交易行的最短操作序列：close 为按 ESC 关闭商品页，trade 为点击交易行按钮
+RECOVERY_ACTIONS = {
+    FlowState.HALL: (),
+    FlowState.PRODUCT: ('close',),
+    FlowState.CONFIRM: ('close',),
+    FlowState.RESULT: ('close',),
+    # 商品页没有出现：可能点击未生效，也可能停在名称无法识别的商品页上，两种情况都能回到交易行
+    FlowState.UNKNOWN: ('close', 'trade'),
+}
+
+
+class PurchaseAttempt:
+    """一次购买尝试在各状态之间传递的数据"""
+
+    __slots__ = ('plan', 'price_info', 'baseline', 'clicked_at', 'verdict', 'bought')
+
+    def __init__(self, plan: CardPlan):
+        self.plan = plan
+        self.price_info: Optional[Dict] = None
+        self.baseline: Optional[np.ndarray] = None  # 点击购买前的提示区域画面，用于排除残留的旧提示
+        self.clicked_at = 0.0
+        self.verdict: Optional[bool] = None
+        self.bought = False
+
+
+class FlowStats:
+    """状态超时与界面恢复计数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timeouts: Counter = Counter()
+        self.recoveries: Counter = Counter()
+        self.refreshes = 0
+        self.identity_hits = 0
+
+    def timeout(self, state: FlowState):
+        with self._lock:
+            self.timeouts[state] += 1
+
+    def recovery(self, state: FlowState):
+        with self._lock:
+            self.recoveries[state] += 1
+
+    def refreshed(self, identity_unchanged: bool):
+        """记录一次页内刷新，identity_unchanged 表示名称区域未变、跳过了名称识别"""
+        with self._lock:
+            self.refreshes += 1
+            self.identity_hits += int(identity_unchanged)
+
+    def format_summary(self) -> Optional[str]:
+        with self._lock:
+            timeouts, recoveries = dict(self.timeouts), dict(self.recoveries)
+            refreshes, identity_hits = self.refreshes, self.identity_hits
+        parts = [f"页内刷新 {refreshes} 次 (跳过名称识别 {identity_hits} 次)"] if refreshes else []
+        parts += [f"等待{state.value}超时 {count} 次" for state, count in timeouts.items()]
+        parts += [f"从{state.value}恢复 {count} 次" for state, count in recoveries.items()]
+        return " | ".join(parts) or None
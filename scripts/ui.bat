@@ -1,2 +1 @@
 python -m PyQt5.uic.pyuic .\牛角州.ui -o ui.py -x
-python -m PyQt5.uic.pyuic .\product_item.ui -o .\product_item_ui.py -x
@@ -0,0 +1,406 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from input_backend import InputBackend
+
+# 界面状态
+SCREEN_LOBBY = "lobby"
+SCREEN_HALL = "hall"
+SCREEN_PRODUCT = "product"
+
+DEFAULT_LATENCY = {
+    'trade': 0.0,         # 点击交易行按钮到列表出现
+    'open_product': 0.0,  # 点击商品到商品页出现
+    'close': 0.0,         # ESC 到返回列表
+    'purchase': 0.0,      # 点击购买到出现提示
+    'refresh': 0.0,       # 商品页内刷新到价格更新
+}
+TRUTH_CACHE_LIMIT = 4096
+SIGNATURE_BITS = 32  # 未指定字体时在文字下方绘制的条码位数
+QUANTITY_MAX_DIGITS = 4
+
+
+def _inside(point: Tuple[float, float], region: List[int]) -> bool:
+    x, y = point
+    return region[0] <= x < region[0] + region[2] and region[1] <= y < region[1] + region[3]
+
+
+def _overlaps(a: List[int], b: List[int]) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class TradingHouseSimulator:
+    """
+    确定性的交易行模拟器
+
+    按场景文件模拟交易行列表、商品页（名称与价格）、购买提示和界面延迟。
+    商品价格按进入商品页的次数依次取 prices 中的值（超出后保持最后一个），
+    因此同一场景每次运行的价格序列完全相同。
+    布局中配置了 quantity_input_location / total_price_location 时，商品页显示数量输入框和总价，
+    点击输入框后可用退格和数字键修改购买数量。商品页内按 F5 或点击 refresh_location 会刷新价格（计为一次查看）。
+    """
+
+    def __init__(self, scenario: Dict, clock=time.perf_counter):
+        self.scenario = scenario
+        self.clock = clock
+        self.width, self.height = scenario.get("screen", [1920, 1080])
+        self.layout = scenario["layout"]
+        self.latency = {**DEFAULT_LATENCY, **scenario.get("latency", {})}
+        self.products = [dict(product, visits=0, stock=product.get("stock", 1 << 30))
+                         for product in scenario["products"]]
+        font_path = scenario.get("font")
+        self.font = ImageFont.truetype(font_path, scenario.get("font_size", 28)) if font_path \
+            else ImageFont.load_default()
+        # 默认字体没有中文字形，不同的中文文字会画成相同的方框，需要额外的条码区分画面
+        self.draw_signature = not font_path
+
+        self._lock = threading.Lock()
+        self._screen = SCREEN_LOBBY
+        self._product: Optional[int] = None
+        self._price: Optional[int] = None
+        self._banner: Optional[str] = None
+        self._quantity_text = "1"
+        self._quantity_focused = False
+        self._pending: List[Tuple[float, str, Optional[int]]] = []
+        self.purchases: List[Tuple[str, int]] = []
+        self.events = {'click': 0, 'move': 0, 'press': 0, 'grab': 0, 'product_views': 0}
+
+    # ---- 状态迁移 ----
+
+    def _schedule(self, delay_key: str, transition: str, arg: Optional[int] = None):
+        self._pending.append((self.clock() + self.latency[delay_key], transition, arg))
+
+    def _advance(self):
+        """应用所有已到期的界面变化"""
+        now = self.clock()
+        due = [item for item in self._pending if item[0] <= now]
+        if not due:
+            return
+        self._pending = [item for item in self._pending if item[0] > now]
+        for _, transition, arg in sorted(due, key=lambda item: item[0]):
+            if transition == "hall":
+                self._screen, self._product, self._banner = SCREEN_HALL, None, None
+            elif transition == "product":
+                product = self.products[arg]
+                prices = product["prices"]
+                self._price = prices[min(product["visits"], len(prices) - 1)]
+                product["visits"] += 1
+                self.events['product_views'] += 1
+                self._screen, self._product, self._banner = SCREEN_PRODUCT, arg, None
+                self._quantity_text, self._quantity_focused = "1", False
+            elif transition == "purchase":
+                self._complete_purchase()
+
+    def _complete_purchase(self):
+        product = self.products[self._product]
+        quantity = int(self._quantity_text or 0)
+        if quantity <= 0:
+            self._banner = "购买失败"
+            return
+        if product["stock"] < quantity:
+            self._banner = "库存不足"
+            return
+        product["stock"] -= quantity
+        self.purchases.extend([(product["name"], self._price)] * quantity)
+        self._banner = "购买成功"
+
+    def click(self, x: float, y: float):
+        with self._lock:
+            self._advance()
+            self.events['click'] += 1
+            if self._screen in (SCREEN_LOBBY, SCREEN_HALL) and _inside((x, y), self.layout["trade_btn_location"]):
+                self._schedule('trade', "hall")
+            elif self._screen == SCREEN_HALL:
+                for index, product in enumerate(self.products):
+                    if _inside((x, y), product["position"]):
+                        self._schedule('open_product', "product", index)
+                        break
+            elif self._screen == SCREEN_PRODUCT and self._banner is None:
+                quantity_region = self.layout.get("quantity_input_location")
+                self._quantity_focused = bool(quantity_region) and _inside((x, y), quantity_region)
+                if _inside((x, y), self.layout["buy_btn_location"]):
+                    self._schedule('purchase', "purchase")
+                elif self.layout.get("refresh_location") and _inside((x, y), self.layout["refresh_location"]):
+                    self._schedule('refresh', "product", self._product)
+
+    def move(self, x: float, y: float):
+        """移动光标不改变界面，只计数"""
+        with self._lock:
+            self.events['move'] += 1
+
+    def press(self, key: str):
+        with self._lock:
+            self._advance()
+            self.events['press'] += 1
+            if key == "esc" and self._screen == SCREEN_PRODUCT:
+                self._schedule('close', "hall")
+            elif key == "f5" and self._screen == SCREEN_PRODUCT and self._banner is None:
+                self._schedule('refresh', "product", self._product)
+            elif self._quantity_focused and self._screen == SCREEN_PRODUCT:
+                if key == "backspace":
+                    self._quantity_text = self._quantity_text[:-1]
+                elif key.isdigit() and len(self._quantity_text) < QUANTITY_MAX_DIGITS:
+                    self._quantity_text += key
+
+    # ---- 画面 ----
+
+    def _visible_texts(self) -> List[Tuple[List[int], str]]:
+        """当前画面上的所有文字及其所在区域"""
+        texts = []
+        if self._screen in (SCREEN_LOBBY, SCREEN_HALL):
+            texts.append((self.layout["trade_btn_location"], "交易行"))
+        if self._screen == SCREEN_HALL:
+            texts.extend((product["position"], product["name"]) for product in self.products)
+        elif self._screen == SCREEN_PRODUCT:
+            product = self.products[self._product]
+            texts.append((self.layout["product_name_location"], product["name"]))
+            texts.append((self.layout["product_price_location"], f"{self._price:,}"))
+            texts.append((self.layout["buy_btn_location"], "购买"))
+            if self.layout.get("quantity_input_location"):
+                texts.append((self.layout["quantity_input_location"], self._quantity_text or "0"))
+            if self.layout.get("total_price_location"):
+                total = self._price * int(self._quantity_text or 0)
+                texts.append((self.layout["total_price_location"], f"{total:,}"))
+            if self._banner:
+                texts.append((self.layout["buy_message_location"], self._banner))
+        return texts
+
+    def grab(self, region) -> Tuple[Image.Image, List[str]]:
+        """渲染区域截图，同时返回区域内文字的真实值"""
+        with self._lock:
+            self._advance()
+            self.events['grab'] += 1
+            texts = self._visible_texts()
+        region = [int(v) for v in region]
+        image = Image.new("L", (region[2], region[3]), 0)
+        draw = ImageDraw.Draw(image)
+        truth = []
+        for box, text in texts:
+            if not _overlaps(box, region):
+                continue
+            x, y = box[0] - region[0] + 4, box[1] - region[1] + 4
+            draw.text((x, y), text, fill=255, font=self.font)
+            if self.draw_signature:
+                self._draw_signature(draw, x, y + 20, text)
+            center = (box[0] + box[2] / 2, box[1] + box[3] / 2)
+            if _inside(center, region):
+                truth.append(text)
+        return image, truth
+
+    @staticmethod
+    def _draw_signature(draw: ImageDraw.ImageDraw, x: int, y: int, text: str):
+        """按文字的 CRC32 绘制条码，保证不同文字的画面不同"""
+        checksum = zlib.crc32(text.encode("utf-8"))
+        for bit in range(SIGNATURE_BITS):
+            if checksum >> bit & 1:
+                draw.rectangle((x + bit * 3, y, x + bit * 3 + 1, y + 5), fill=255)
+
+    def report(self, elapsed: float) -> Dict:
+        """运行统计与正确性检查"""
+        ceilings = {product["name"]: int(product["expect_price"] * (1 + product.get("floating_percentage_range", 0)))
+                    for product in self.products}
+        violations = [(name, price) for name, price in self.purchases if price > ceilings[name]]
+        return {
+            'elapsed': round(elapsed, 3),
+            'product_views': self.events['product_views'],
+            'checks_per_minute': round(self.events['product_views'] / elapsed * 60, 1) if elapsed else 0,
+            'clicks': self.events['click'],
+            'moves': self.events['move'],
+            'key_presses': self.events['press'],
+            'grabs': self.events['grab'],
+            'purchases': self.purchases,
+            'overpriced_purchases': violations,
+        }
+
+
+class SimulatedCapture:
+    """截图替身：从模拟器渲染画面，并登记截图对应的真实文字供 SimulatedOcr 使用"""
+
+    def __init__(self, simulator: TradingHouseSimulator):
+        self.simulator = simulator
+        self.truth: Dict[Tuple, List[str]] = {}
+
+    def size(self):
+        return self.simulator.width, self.simulator.height
+
+    def grab(self, region, threshold):
+        image, texts = self.simulator.grab(region)
+        if len(self.truth) > TRUTH_CACHE_LIMIT:
+            self.truth.clear()
+        self.truth[self.key(np.asarray(image))] = texts
+        return image
+
+    @staticmethod
+    def key(array: np.ndarray) -> Tuple:
+        return array.shape, hash(array.tobytes())
+
+
+class SimulatedInput(InputBackend):
+    """输入替身：把点击和按键交给模拟器"""
+
+    name = "simulated"
+
+    def __init__(self, simulator: TradingHouseSimulator):
+        self.simulator = simulator
+
+    def move(self, x: float, y: float):
+        self.simulator.move(x, y)
+
+    def click(self, x: float, y: float):
+        self.simulator.click(x, y)
+
+    def press(self, key: str):
+        self.simulator.press(key)
+
+
+class SimulatedOcr:
+    """
+    OCR替身：直接返回截图中文字的真实值，接口与 OcrEnginePool 一致
+
+    给出 misreads（场景中的 ocr_misreads: {"rate", "confidence", "seed"}）时，数字按 rate 的概率
+    丢掉首位并以低置信度返回，用于检查置信度把关能否避免按误读的低价购买。
+    """
+
+    size = 1
+
+    def __init__(self, capture: SimulatedCapture, misreads: Optional[Dict] = None):
+        self.capture = capture
+        self.misreads = misreads or {}
+        self._random = random.Random(self.misreads.get("seed", 0))
+
+    def acquire(self):
+        pass
+
+    def release(self):
+        pass
+
+    def submit(self, lang: str, image, cls: bool = False) -> Future:
+        future = Future()
+        texts = self.capture.truth.get(SimulatedCapture.key(np.asarray(image)), [])
+        lines = [[None, self._misread(text)] for text in texts]
+        future.set_result([lines or None])
+        return future
+
+    def ocr(self, lang: str, image, cls: bool = False):
+        return self.submit(lang, image, cls).result()
+
+    def _misread(self, text: str) -> Tuple[str, float]:
+        if text[:1].isdigit() and self._random.random() < self.misreads.get("rate", 0):
+            return text[1:].lstrip(","), self.misreads.get("confidence", 0.5)
+        return text, 1.0
+
+
+class SimulatedWindowTracker:
+    """窗口替身：模拟器画面即整个屏幕"""
+
+    def resolve(self) -> bool:
+        return True
+
+    def activate(self) -> bool:
+        return True
+
+    def is_foreground(self) -> bool:
+        return True
+
+    @staticmethod
+    def to_screen_point(point):
+        return point
+
+    @staticmethod
+    def to_screen_region(region):
+        return region
+
+
+def build_config(scenario: Dict) -> Dict:
+    """根据场景生成引擎使用的 config.json 内容"""
+    config = {
+        "is_debug": False,
+        "is_loop": True,
+        "exec_interval": 0.0,
+        "buy_confirm_interval": 0.5,
+    }
+    config.update(scenario["layout"])
+    config.update(scenario.get("config", {}))
+    config["products"] = [
+        {
+            "name": product["name"],
+            "type": "",
+            "expect_price": product["expect_price"],
+            "floating_percentage_range": product.get("floating_percentage_range", 0),
+            "enable_buy": product.get("enable_buy", True),
+            "buy_count": product.get("buy_count", 1),
+            "buy_quantity": product.get("buy_quantity", 1),
+            "already_buy_count": 0,
+            "position": product["position"],
+        }
+        for product in scenario["products"]
+    ]
+    return config
+
+
+def run_scenario(scenario: Dict, logger: logging.Logger, duration: float = 10.0, real_ocr: bool = False) -> Dict:
+    """在模拟器上运行未修改的抢购引擎，返回运行统计"""
+    from config import set_config_path
+    from engine import PurchaseEngine
+
+    simulator = TradingHouseSimulator(scenario)
+    capture = SimulatedCapture(simulator)
+    ocr = None if real_ocr else SimulatedOcr(capture, scenario.get("ocr_misreads"))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config_path = os.path.join(workdir, "config.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump(build_config(scenario), f, ensure_ascii=False, indent=4)
+        set_config_path(config_path)
+
+        engine = PurchaseEngine(logger, input_backend=SimulatedInput(simulator), ocr_pool=ocr,
+                                capture=capture, window_tracker=SimulatedWindowTracker())
+        stopped = threading.Event()
+        engine.on_stopped = stopped.set
+
+        started_at = time.perf_counter()
+        engine.start()
+        stopped.wait(duration)
+        engine.stop()
+        elapsed = time.perf_counter() - started_at
+
+    report = simulator.report(elapsed)
+    report['confirm_latency'] = engine.confirm_latency.summary()
+    return report
+
+
+def main(argv=None) -> int:
+    from cli import configure_cli_logger
+
+    parser = argparse.ArgumentParser(description="交易行模拟器：在本地场景上运行抢购引擎")
+    parser.add_argument("scenario", help="场景文件路径")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="最长运行时间（秒）")
+    parser.add_argument("--real-ocr", action="store_true", help="使用 PaddleOCR 识别渲染出的画面")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    args = parser.parse_args(argv)
+
+    with open(args.scenario, "r", encoding="utf-8") as f:
+        scenario = json.load(f)
+    logger = configure_cli_logger(verbose=args.verbose)
+    report = run_scenario(scenario, logger, args.duration, args.real_ocr)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    return 1 if report['overpriced_purchases'] else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
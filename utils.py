@@ -1,23 +1,19 @@
 import time
 
-import pyautogui
-import pygetwindow as gw
-
-from selection_window import SelectionWindow
+from config import read_all_config, update_config_field
+from window_tracker import get_default_tracker
 
 def check_game_window(self, parent):
     """检查游戏窗口是否存在"""
-    # 获取并激活窗口标题包含“三角洲”的窗口
-    target_window = None
-    for window in gw.getAllTitles():
-        if "三角洲" in window:  # 模糊匹配窗口标题
-            target_window = gw.getWindowsWithTitle(window)[0]
-            break
+    # 界面相关依赖只在这里导入，保证无界面运行时不依赖 PyQt
+    from selection_window import SelectionWindow
 
-    if target_window:
-        target_window.activate()  # 激活“三角洲”窗口
+    # 激活游戏窗口（句柄已缓存时不再枚举所有窗口）
+    tracker = get_default_tracker()
+    if tracker.activate():
+        self.game_window = tracker
 
-        print(f"已激活窗口：{target_window.title}")
+        print(f"已激活窗口：{tracker.window.title}")
 
         # 最小化主窗口
         parent.showMinimized()
@@ -36,21 +32,25 @@ def check_game_window(self, parent):
         return False
 
 
-def switch_game_window():
-    """检查游戏窗口是否存在"""
-    # 获取并激活窗口标题包含“三角洲”的窗口
-    target_window = None
-    for window in gw.getAllTitles():
-        if "三角洲" in window:  # 模糊匹配窗口标题
-            target_window = gw.getWindowsWithTitle(window)[0]
-            break
-
-    if target_window:
-        target_window.activate()  # 激活“三角洲”窗口
-        print(f"已激活窗口：{target_window.title}")
-        return True
-    else:
-        return False
+def uses_window_origin(config):
+    """区域坐标是否以游戏窗口左上角为原点（多实例模式下总是如此）"""
+    return bool(config.get("instances")) or config.get("region_origin", "screen") == "window"
+
+
+def to_config_position(tracker, x, y):
+    """
+    将框选得到的屏幕坐标转换为配置中使用的坐标
+
+    屏幕坐标模式下，首次框选时把窗口位置保存为 region_window_origin，之后的框选按窗口相对它的位移换算回去，
+    所有区域都以同一个窗口位置为基准，运行时按窗口相对该位置的位移修正。
+    """
+    if tracker is None:
+        return x, y
+    left, top = tracker.origin
+    if uses_window_origin(read_all_config()):
+        return x - left, y - top
+    anchor = update_config_field("region_window_origin", lambda saved: saved or [left, top])
+    return x - (left - anchor[0]), y - (top - anchor[1])
 
 
 def get_list_map_index(list_map, key, val):
@@ -60,6 +60,8 @@ def get_list_map_index(list_map, key, val):
 
 def take_screenshot(region, threshold):
     """截取指定区域的截图并二值化"""
+    import pyautogui
+
     try:
         screenshot = pyautogui.screenshot(region=region)
         gray_image = screenshot.convert("L")  # 转换为灰度图像
@@ -70,3 +72,17 @@ def take_screenshot(region, threshold):
     except Exception as e:
         print(f"[错误] 截图失败: {str(e)}")
         return None
+
+
+class ScreenCapture:
+    """基于 pyautogui 的屏幕截图来源，可替换为模拟器等其他实现"""
+
+    def size(self):
+        """屏幕分辨率"""
+        import pyautogui
+
+        return pyautogui.size()
+
+    def grab(self, region, threshold):
+        """截取屏幕区域并转换为灰度图"""
+        return take_screenshot(region, threshold)
@@ -0,0 +1,156 @@
+import ctypes
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+GAME_WINDOW_KEYWORD = "三角洲"
+GEOMETRY_CHECK_INTERVAL = 0.05  # 两次查询窗口位置的最小间隔
+
+
+def find_game_windows():
+    """获取所有游戏窗口，按屏幕位置从左到右、从上到下排序"""
+    # pygetwindow 仅支持 Windows，延迟导入以便在其他平台加载本模块
+    import pygetwindow as gw
+
+    windows = [window for window in gw.getAllWindows() if GAME_WINDOW_KEYWORD in window.title]
+    return sorted(windows, key=lambda window: (window.left, window.top))
+
+
+def find_game_window(title=None, index=0):
+    """按完整标题或排序后的序号查找游戏窗口"""
+    windows = find_game_windows()
+    if title:
+        for window in windows:
+            if window.title == title:
+                return window
+        return None
+    return windows[index] if 0 <= index < len(windows) else None
+
+
+if sys.platform == "win32":
+    class _Rect(ctypes.Structure):
+        _fields_ = [("left", ctypes.c_long),
+                    ("top", ctypes.c_long),
+                    ("right", ctypes.c_long),
+                    ("bottom", ctypes.c_long)]
+
+
+class WindowTracker:
+    """
+    游戏窗口句柄缓存与位置跟踪
+
+    只在首次使用或句柄失效时枚举窗口，之后直接通过句柄查询窗口位置。
+    relative=True 时配置坐标相对于窗口左上角；否则配置为窗口位于 anchor（框选区域时保存的窗口位置）时的屏幕坐标，
+    窗口不在该位置时按位移量修正。没有保存 anchor 的旧配置以首次绑定时的窗口位置为基准。
+    """
+
+    def __init__(self, title: Optional[str] = None, index: int = 0, relative: bool = False, logger=None,
+                 anchor: Optional[Tuple[int, int]] = None):
+        self.title = title
+        self.index = index
+        self.relative = relative
+        self.anchor = tuple(anchor) if anchor and not relative else None
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._window = None
+        self._hwnd: Optional[int] = None
+        self._origin: Tuple[int, int] = (0, 0)
+        self._anchor: Tuple[int, int] = self.anchor or (0, 0)
+        self._checked_at = 0.0
+        self._user32 = ctypes.windll.user32 if sys.platform == "win32" else None
+
+    @property
+    def window(self):
+        """当前绑定的 pygetwindow 窗口对象"""
+        return self._window
+
+    def resolve(self) -> bool:
+        """枚举窗口并缓存句柄，已绑定且句柄有效时直接返回"""
+        with self._lock:
+            if self._window is not None and self._is_alive():
+                return True
+            window = find_game_window(self.title, self.index)
+            if window is None:
+                self._window, self._hwnd = None, None
+                return False
+            first_bind = self._hwnd is None
+            self._window = window
+            self._hwnd = getattr(window, "_hWnd", None)
+            self._origin = self._query_origin()
+            self._checked_at = time.perf_counter()
+            if first_bind and not self.relative and self.anchor is None:
+                # 窗口重开后仍以首次绑定时的位置为基准
+                self._anchor = self._origin
+        if self.logger:
+            self.logger.info("已绑定游戏窗口: %s %s", window.title, self._origin)
+        return True
+
+    def _is_alive(self) -> bool:
+        if self._user32 is None or self._hwnd is None:
+            return True
+        return bool(self._user32.IsWindow(self._hwnd))
+
+    def _query_origin(self) -> Tuple[int, int]:
+        """查询窗口左上角坐标（一次系统调用）"""
+        if self._user32 is None or self._hwnd is None:
+            return (self._window.left, self._window.top)
+        rect = _Rect()
+        self._user32.GetWindowRect(self._hwnd, ctypes.byref(rect))
+        return (rect.left, rect.top)
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        """窗口当前左上角坐标，句柄失效时重新枚举"""
+        now = time.perf_counter()
+        if now - self._checked_at < GEOMETRY_CHECK_INTERVAL:
+            return self._origin
+        if not self.resolve():
+            raise RuntimeError("游戏窗口已关闭")
+        origin = self._query_origin()
+        if origin != self._origin and self.logger:
+            self.logger.info("游戏窗口位置变化: %s -> %s", self._origin, origin)
+        self._origin = origin
+        self._checked_at = now
+        return origin
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """配置坐标到屏幕坐标的平移量"""
+        x, y = self.origin
+        return (x - self._anchor[0], y - self._anchor[1])
+
+    def to_screen_point(self, point: Tuple[float, float]) -> Tuple[float, float]:
+        """配置坐标点转换为屏幕坐标"""
+        dx, dy = self.offset
+        return (point[0] + dx, point[1] + dy)
+
+    def to_screen_region(self, region: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+        """配置区域转换为屏幕区域"""
+        dx, dy = self.offset
+        return (region[0] + dx, region[1] + dy, region[2], region[3])
+
+    def is_foreground(self) -> bool:
+        """窗口是否处于前台"""
+        if self._user32 is None or self._hwnd is None:
+            return self._window is not None and self._window.isActive
+        return self._user32.GetForegroundWindow() == self._hwnd
+
+    def activate(self) -> bool:
+        """激活窗口，未绑定时先查找"""
+        if not self.resolve():
+            return False
+        if not self.is_foreground():
+            self._window.activate()
+        return True
+
+
+_default_tracker: Optional[WindowTracker] = None
+
+
+def get_default_tracker() -> WindowTracker:
+    """界面框选时使用的默认窗口跟踪器"""
+    global _default_tracker
+    if _default_tracker is None:
+        _default_tracker = WindowTracker()
+    return _default_tracker